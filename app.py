@@ -9,6 +9,11 @@ It uses SQLAlchemy for database operations, Redis for deduplication, and Jinja2
 """
 
 import os
+import uuid
+import secrets
+import asyncio
+from collections import Counter
+import orjson
 from dotenv import load_dotenv
 from fastapi import FastAPI, Request, Depends, HTTPException, status
 from fastapi.responses import PlainTextResponse, HTMLResponse
@@ -16,9 +21,19 @@ from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
 import redis
 
-from database import get_db, User
-from wa_handler import send_message, get_whatsapp_media, send_voice_message
+from database import get_db, read_session, replica_router, User
+from wa_handler import (
+    send_message,
+    send_voice_message,
+    get_whatsapp_media_url,
+    download_whatsapp_media,
+)
 from models import Translator
+from resilience import SpitchUnavailableError, spitch_breaker, translate_latency, hedge_stats
+from lanes import LaneFullError, text_lane, audio_lane, run_blocking
+from capture import WebhookRecorder
+from profiling import sample_stacks, dump_tasks, TracemallocTracker
+import language_id
 
 # Load environment variables from .env file
 load_dotenv()
@@ -40,6 +55,19 @@ REDIS_USERNAME = os.environ.get("REDIS_USERNAME")
 REDIS_PASSWORD = os.environ.get("REDIS_PASSWORD")
 SIGNUP_PAGE = os.environ.get("SIGNUP")
 SETTINGS_PAGE = os.environ.get("SETTINGS")
+WEBHOOK_CAPTURE_FILE = os.environ.get("WEBHOOK_CAPTURE_FILE")
+WEBHOOK_CAPTURE_SALT = os.environ.get("WEBHOOK_CAPTURE_SALT")
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN")
+
+# Cheap reply sent when Spitch is slow or the circuit breaker is open
+SERVICE_BUSY_MESSAGE = (
+    "Wazobia is busy right now. Please try again in a few minutes."
+)
+
+# Fast reply sent when a lane's queue is full
+LANE_BUSY_MESSAGE = (
+    "We're receiving a lot of messages right now. Please try again shortly."
+)
 
 # Redis client initialization
 r = redis.Redis(
@@ -50,21 +78,129 @@ r = redis.Redis(
     password=REDIS_PASSWORD,
 )
 
+# Share read-your-writes markers between workers
+replica_router.redis = r
+
 # Translator instance
 translator = Translator()
 
-async def get_user_settings(phone_number: str, db: Session) -> User:
+# Optional recorder of anonymized webhook payloads for load testing
+recorder = (
+    WebhookRecorder(WEBHOOK_CAPTURE_FILE, salt=WEBHOOK_CAPTURE_SALT)
+    if WEBHOOK_CAPTURE_FILE
+    else None
+)
+
+# Memory growth tracker and guard against overlapping profiler runs
+tracemalloc_tracker = TracemallocTracker()
+profile_lock = asyncio.Lock()
+
+# Webhook payload counts by kind, and status callbacks by status
+webhook_counts = Counter()
+status_counts = Counter()
+
+async def get_user_settings(phone_number: str) -> User:
     """
     Retrieve user settings from the database by phone number.
 
+    The lookup is read-only, so it is routed to a read replica when one is
+    configured, unless the user's settings were written very recently.
+
     Args:
         phone_number (str): The user's phone number.
-        db (Session): SQLAlchemy database session.
 
     Returns:
         User: User object if found, else None.
     """
-    return db.query(User).filter(User.phone_number == phone_number).first()
+    def lookup():
+        with read_session(phone_number) as db:
+            return db.query(User).filter(User.phone_number == phone_number).first()
+
+    return await run_blocking(lookup)
+
+async def claim_message(message_id: str) -> bool:
+    """
+    Atomically mark a WhatsApp message ID as processed in Redis.
+
+    Args:
+        message_id (str): The WhatsApp message ID.
+
+    Returns:
+        bool: True if this call claimed the message, False if it was
+        already processed.
+    """
+    redis_key = f"msgid:{message_id}"
+    return bool(await run_blocking(r.set, redis_key, 1, nx=True, ex=600))  # 10 minutes
+
+def message_value(body: dict):
+    """
+    Find the change value that carries messages in a WhatsApp webhook
+    payload. A batched delivery can carry several entries and changes, and
+    the messages are not always in the first one.
+
+    Args:
+        body (dict): The parsed webhook payload.
+
+    Returns:
+        dict: The first change value with messages, or None if there is none.
+    """
+    for entry in body.get("entry") or []:
+        for change in entry.get("changes") or []:
+            value = change.get("value") or {}
+            if value.get("messages"):
+                return value
+    return None
+
+def classify_webhook(body: dict) -> str:
+    """
+    Classify a WhatsApp webhook payload without touching the DB or Redis.
+
+    Args:
+        body (dict): The parsed webhook payload.
+
+    Returns:
+        str: "message" if any change carries messages, "status" if the
+        payload only carries delivery/read statuses, else "other".
+    """
+    if message_value(body) is not None:
+        return "message"
+    for entry in body.get("entry") or []:
+        for change in entry.get("changes") or []:
+            if (change.get("value") or {}).get("statuses"):
+                return "status"
+    return "other"
+
+def count_statuses(body: dict) -> None:
+    """
+    Aggregate status callbacks (sent/delivered/read/failed) for metrics.
+
+    Args:
+        body (dict): The parsed webhook payload.
+    """
+    for entry in body.get("entry") or []:
+        for change in entry.get("changes") or []:
+            for item in (change.get("value") or {}).get("statuses") or []:
+                status_counts[item.get("status", "unknown")] += 1
+
+async def _skip(value=None):
+    """
+    Placeholder step for the webhook dependency graph.
+    """
+    return value
+
+def cleanup_files(*paths: str) -> None:
+    """
+    Remove temporary audio files, ignoring ones that do not exist.
+
+    Args:
+        *paths (str): File paths to remove.
+    """
+    for fname in paths:
+        try:
+            if os.path.exists(fname):
+                os.remove(fname)
+        except Exception as cleanup_err:
+            print(f"Error cleaning up file {fname}: {cleanup_err}")
 
 @app.get("/")
 async def root():
@@ -73,6 +209,94 @@ async def root():
     """
     return {"message": "Welcome to Wazobia"}
 
+def require_admin(request: Request) -> None:
+    """
+    Dependency that checks the admin bearer token.
+
+    Admin endpoints are disabled unless ADMIN_TOKEN is set.
+    """
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    auth = request.headers.get("Authorization", "")
+    if not secrets.compare_digest(auth, f"Bearer {ADMIN_TOKEN}"):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Unauthorized")
+
+@app.get("/metrics", dependencies=[Depends(require_admin)])
+async def metrics():
+    """
+    Runtime metrics: webhook and status callback counts, lane depths and
+    wait times, Spitch call health, read replica routing, and local
+    language identification outcomes.
+    """
+    return {
+        "webhooks": dict(webhook_counts),
+        "statuses": dict(status_counts),
+        "lanes": {
+            text_lane.name: text_lane.stats(),
+            audio_lane.name: audio_lane.stats(),
+        },
+        "spitch": {
+            "breaker": spitch_breaker.stats(),
+            "translate_latency": translate_latency.summary(),
+            "hedging": dict(hedge_stats),
+            "batching": translator.batcher.stats(),
+        },
+        "database": replica_router.stats(),
+        "language_id": dict(language_id.stats),
+    }
+
+@app.get("/admin/profile", dependencies=[Depends(require_admin)])
+async def admin_profile(seconds: float = 10, interval_ms: float = 5):
+    """
+    Sample all threads for N seconds (max 60).
+
+    Returns:
+        Collapsed stacks, one "frame;frame;... count" line per stack, ready
+        for flamegraph.pl or speedscope.
+    """
+    if profile_lock.locked():
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Profile already running")
+    async with profile_lock:
+        stacks = await run_blocking(
+            sample_stacks, min(max(seconds, 0.1), 60), max(interval_ms, 1) / 1000
+        )
+    return PlainTextResponse(stacks)
+
+@app.get("/admin/tasks", dependencies=[Depends(require_admin)])
+async def admin_tasks(contains: str = None):
+    """
+    Dump pending asyncio tasks and the awaits each is blocked on.
+    Use `?contains=webhook_post` to show only in-flight webhooks.
+    """
+    tasks = dump_tasks(contains)
+    return {"count": len(tasks), "tasks": tasks}
+
+@app.post("/admin/tracemalloc/start", dependencies=[Depends(require_admin)])
+async def admin_tracemalloc_start(frames: int = 10):
+    """
+    Start tracemalloc and take a baseline snapshot.
+    """
+    await run_blocking(tracemalloc_tracker.start, frames)
+    return {"status": "tracing"}
+
+@app.get("/admin/tracemalloc", dependencies=[Depends(require_admin)])
+async def admin_tracemalloc_diff(top: int = 20):
+    """
+    Diff a new tracemalloc snapshot against the previous one.
+    """
+    try:
+        return await run_blocking(tracemalloc_tracker.diff, top)
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+@app.post("/admin/tracemalloc/stop", dependencies=[Depends(require_admin)])
+async def admin_tracemalloc_stop():
+    """
+    Stop tracemalloc.
+    """
+    tracemalloc_tracker.stop()
+    return {"status": "stopped"}
+
 @app.get("/signup", response_class=HTMLResponse)
 async def signup_form(request: Request):
     """
@@ -139,6 +363,7 @@ async def signup(request: Request, db: Session = Depends(get_db)):
     db.add(user)
     db.commit()
     db.refresh(user)
+    replica_router.mark_written(user.phone_number)
 
     return {"message": "User created successfully", "status": "success"}
 
@@ -184,6 +409,7 @@ async def update_setting(request: Request, db: Session = Depends(get_db)):
 
     db.commit()
     db.refresh(user)
+    replica_router.mark_written(user.phone_number)
 
     return {"message": "Settings updated successfully", "status": "success"}
 
@@ -227,187 +453,273 @@ async def webhook_get(request: Request):
     return PlainTextResponse("Forbidden", status_code=status.HTTP_403_FORBIDDEN)
 
 @app.post("/webhook")
-async def webhook_post(request: Request, db: Session = Depends(get_db)):
+async def webhook_post(request: Request):
     """
     WhatsApp webhook handler (POST).
 
-    Handles incoming WhatsApp messages (text/audio), deduplicates using Redis,
-    and responds with translated text or audio as per user settings.
+    Status callbacks and other non-message payloads are acknowledged
+    straight away, without a DB session, Redis call or outbound send.
+    Messages are handed to `process_webhook_message`.
 
     Returns:
         "PROCESSED" if handled successfully.
     """
     try:
-        body = await request.json()
-        entry = body.get("entry", [{}])[0]
-        changes = entry.get("changes", [{}])[0]
-        value = changes.get("value", {})
-        contacts = value.get("contacts", [{}])
-        messages = value.get("messages", [{}])
-
-        # Deduplication using Redis
-        message_obj = messages[0] if messages else {}
-        message_id = message_obj.get("id")
-        if message_id:
-            redis_key = f"msgid:{message_id}"
-            if r.get(redis_key):
-                return PlainTextResponse(
-                    "Message already processed", status_code=status.HTTP_200_OK
-                )
-            r.setex(redis_key, 600, 1)  # 10 minutes
-
-        # Extract user phone number
-        user_phone_number = contacts[0].get("wa_id") if contacts else None
-        if not user_phone_number:
+        body = orjson.loads(await request.body())
+        if recorder is not None:
+            try:
+                await run_blocking(recorder.record, body)
+            except Exception as e:
+                print(f"Error recording webhook: {e}")
+        kind = classify_webhook(body)
+        webhook_counts[kind] += 1
+        if kind != "message":
+            if kind == "status":
+                count_statuses(body)
             return PlainTextResponse("PROCESSED", status_code=status.HTTP_200_OK)
 
-        # Handle text messages
-        if messages and messages[0].get("text"):
-            user_message = messages[0]["text"]["body"]
-            user = await get_user_settings(phone_number=user_phone_number, db=db)
-
-            if user:
-                # Check if user requested settings
-                if user_message.strip().lower() == "settings":
-                    await send_message(
-                        message=f"To update your settings, please visit: {SETTINGS_PAGE}",
-                        phone_number=user_phone_number,
-                    )
-                # Respond based on user output format
-                elif user.output_format == "text":
-                    text_response = await translator.text_to_text_translator(
-                        user_message,
-                        source=user.default_language,
-                        target=user.output_language,
-                    )
-                    await send_message(
-                        message=text_response, phone_number=user_phone_number
-                    )
-                elif user.output_format == "audio":
-                    status_audio = await translator.text_to_voice_translator(
-                        user_message,
-                        input_language=user.default_language,
-                        output_language=user.output_language,
-                    )
-                    if status_audio:
-                        await send_voice_message("new.wav", user_phone_number)
-                    else:
-                        await send_message(
-                            message="Error processing audio file",
-                            phone_number=user_phone_number,
-                        )
-                else:
-                    # Both text and audio
-                    text_response = await translator.text_to_text_translator(
-                        user_message,
-                        source=user.default_language,
-                        target=user.output_language,
-                    )
-                    status_audio = await translator.text_to_voice_translator(
-                        user_message,
-                        input_language=user.default_language,
-                        output_language=user.output_language,
-                    )
-                    await send_message(
-                        message=text_response, phone_number=user_phone_number
-                    )
-                    if status_audio:
-                        await send_voice_message("new.wav", user_phone_number)
-                    else:
-                        await send_message(
-                            message="Error processing audio file",
-                            phone_number=user_phone_number,
-                        )
-            else:
-                # User not found, prompt signup
-                msg = (
-                    f"Welcome to Wazobia, your AI translator right here on WhatsApp, "
-                    f"please click the link to signup \n{SIGNUP_PAGE}"
-                )
-                await send_message(message=msg, phone_number=user_phone_number)
-
-        # Handle audio messages
-        elif messages and messages[0].get("audio"):
-            audio_id = messages[0]["audio"].get("id")
-            if audio_id:
-                audio_bytes = await get_whatsapp_media(audio_media_id=audio_id)
-                audio_file = f"{user_phone_number}.ogg"
-                try:
-                    # Write audio file safely
-                    with open(audio_file, "wb") as f:
-                        f.write(audio_bytes)
-
-                    user = await get_user_settings(phone_number=user_phone_number, db=db)
-
-                    if user:
-                        if user.output_format == "text":
-                            text_response = await translator.voice_to_text_translator(
-                                file_path=audio_file,
-                                default_language=user.default_language,
-                                output_language=user.output_language,
-                            )
-                            await send_message(
-                                message=text_response, phone_number=user_phone_number
-                            )
-                        elif user.output_format == "audio":
-                            status_audio = await translator.voice_to_voice_translator(
-                                file_path=audio_file,
-                                default_language=user.default_language,
-                                output_language=user.output_language,
-                            )
-                            if status_audio:
-                                await send_voice_message("new.mp3", user_phone_number)
-                            else:
-                                await send_message(
-                                    message="Error processing audio file",
-                                    phone_number=user_phone_number,
-                                )
-                        else:
-                            text_response = await translator.voice_to_text_translator(
-                                file_path=audio_file,
-                                default_language=user.default_language,
-                                output_language=user.output_language,
-                            )
-                            status_audio = await translator.voice_to_voice_translator(
-                                file_path=audio_file,
-                                default_language=user.default_language,
-                                output_language=user.output_language,
-                            )
-                            await send_message(
-                                message=text_response, phone_number=user_phone_number
-                            )
-                            if status_audio:
-                                await send_voice_message("new.wav", user_phone_number)
-                            else:
-                                await send_message(
-                                    message="Error processing audio file",
-                                    phone_number=user_phone_number,
-                                )
-                    else:
-                        msg = (
-                            f"Welcome to Wazobia, your AI translator right here on WhatsApp, "
-                            f"please click the link to signup \n{SIGNUP_PAGE}"
-                        )
-                        await send_message(message=msg, phone_number=user_phone_number)
-                finally:
-                    # Clean up audio files
-                    for fname in [audio_file, "new.mp3", "new.wav"]:
-                        try:
-                            if os.path.exists(fname):
-                                os.remove(fname)
-                        except Exception as cleanup_err:
-                            print(f"Error cleaning up file {fname}: {cleanup_err}")
-        # Unsupported message type
-        else:
-            await send_message(
-                "Message format not supported. Wazobia AI only supports text and audio message.",
-                user_phone_number,
-            )
-
-        return PlainTextResponse("PROCESSED", status_code=status.HTTP_200_OK)
+        return await process_webhook_message(message_value(body))
     except Exception as e:
         print(e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal Server Error",
         )
+
+async def process_webhook_message(value: dict) -> PlainTextResponse:
+    """
+    Handle the webhook change value carrying a WhatsApp message.
+
+    Deduplicates using Redis and responds with translated text or audio as
+    per user settings. The dedup claim, user lookup and media URL lookup run
+    concurrently. Text-only jobs run in the text lane and anything involving
+    audio runs in the audio lane; when a lane is full the user is asked to
+    try again.
+
+    Args:
+        value (dict): The change value holding the contacts and messages.
+
+    Returns:
+        PlainTextResponse: The acknowledgement for WhatsApp.
+    """
+    contacts = value.get("contacts", [{}])
+    messages = value.get("messages", [{}])
+
+    message_obj = messages[0] if messages else {}
+    message_id = message_obj.get("id")
+    user_phone_number = contacts[0].get("wa_id") if contacts else None
+    user_message = (message_obj.get("text") or {}).get("body")
+    audio_id = (message_obj.get("audio") or {}).get("id")
+    supported = bool(message_obj.get("text") or message_obj.get("audio"))
+
+    # Independent steps run together: the Redis dedup claim, the user
+    # lookup and, for voice notes, the media URL lookup. Media bytes are
+    # only downloaded later, once the user is known to be registered.
+    claimed, user, media_url = await asyncio.gather(
+        claim_message(message_id) if message_id else _skip(True),
+        get_user_settings(phone_number=user_phone_number)
+        if user_phone_number and supported
+        else _skip(),
+        get_whatsapp_media_url(audio_id)
+        if user_phone_number and user_message is None and audio_id
+        else _skip(),
+        return_exceptions=True,
+    )
+    for result in (claimed, user):
+        if isinstance(result, Exception):
+            raise result
+
+    # Deduplication using Redis
+    if not claimed:
+        return PlainTextResponse(
+            "Message already processed", status_code=status.HTTP_200_OK
+        )
+
+    # Extract user phone number
+    if not user_phone_number:
+        return PlainTextResponse("PROCESSED", status_code=status.HTTP_200_OK)
+
+    # Unsupported message type
+    if not supported:
+        await send_message(
+            "Message format not supported. Wazobia AI only supports text and audio message.",
+            user_phone_number,
+        )
+        return PlainTextResponse("PROCESSED", status_code=status.HTTP_200_OK)
+
+    if not user:
+        # User not found, prompt signup
+        msg = (
+            f"Welcome to Wazobia, your AI translator right here on WhatsApp, "
+            f"please click the link to signup \n{SIGNUP_PAGE}"
+        )
+        await send_message(message=msg, phone_number=user_phone_number)
+        return PlainTextResponse("PROCESSED", status_code=status.HTTP_200_OK)
+
+    # Check if user requested settings
+    if user_message is not None and user_message.strip().lower() == "settings":
+        await send_message(
+            message=f"To update your settings, please visit: {SETTINGS_PAGE}",
+            phone_number=user_phone_number,
+        )
+        return PlainTextResponse("PROCESSED", status_code=status.HTTP_200_OK)
+
+    if isinstance(media_url, Exception):
+        raise media_url
+
+    # Per-message file names so concurrent messages don't clobber each other
+    work_prefix = f"{user_phone_number}-{uuid.uuid4().hex[:8]}"
+    output_wav = f"{work_prefix}.wav"
+    output_mp3 = f"{work_prefix}.mp3"
+
+    # Text in, text out is cheap; everything else goes to the audio lane
+    text_only = user_message is not None and user.output_format == "text"
+    lane = text_lane if text_only else audio_lane
+
+    try:
+        async with lane.admit():
+            if user_message is not None:
+                await handle_text_message(user, user_message, user_phone_number, output_wav)
+            else:
+                await handle_audio_message(user, media_url, user_phone_number, work_prefix)
+    except LaneFullError as e:
+        print(f"Load shed: {e}")
+        await send_message(message=LANE_BUSY_MESSAGE, phone_number=user_phone_number)
+    except SpitchUnavailableError as e:
+        print(f"Spitch unavailable: {e}")
+        await send_message(message=SERVICE_BUSY_MESSAGE, phone_number=user_phone_number)
+    finally:
+        # Clean up generated audio files
+        cleanup_files(output_mp3, output_wav)
+
+    return PlainTextResponse("PROCESSED", status_code=status.HTTP_200_OK)
+
+async def handle_text_message(
+    user: User, user_message: str, user_phone_number: str, output_wav: str
+) -> None:
+    """
+    Translate a text message and reply per the user's output format.
+
+    Args:
+        user (User): The sender's settings.
+        user_message (str): The message text.
+        user_phone_number (str): The sender's WhatsApp ID.
+        output_wav (str): Path for generated WAV audio.
+
+    Raises:
+        SpitchUnavailableError: If Spitch is timing out or the circuit is open.
+    """
+    if user.output_format == "text":
+        text_response = await translator.text_to_text_translator(
+            user_message,
+            source=user.default_language,
+            target=user.output_language,
+        )
+        await send_message(message=text_response, phone_number=user_phone_number)
+    elif user.output_format == "audio":
+        status_audio = await translator.text_to_voice_translator(
+            user_message,
+            input_language=user.default_language,
+            output_language=user.output_language,
+            output_file=output_wav,
+        )
+        if status_audio:
+            await send_voice_message(output_wav, user_phone_number)
+        else:
+            await send_message(
+                message="Error processing audio file",
+                phone_number=user_phone_number,
+            )
+    else:
+        # Both text and audio
+        text_response = await translator.text_to_text_translator(
+            user_message,
+            source=user.default_language,
+            target=user.output_language,
+        )
+        status_audio = await translator.text_to_voice_translator(
+            user_message,
+            input_language=user.default_language,
+            output_language=user.output_language,
+            output_file=output_wav,
+        )
+        await send_message(message=text_response, phone_number=user_phone_number)
+        if status_audio:
+            await send_voice_message(output_wav, user_phone_number)
+        else:
+            await send_message(
+                message="Error processing audio file",
+                phone_number=user_phone_number,
+            )
+
+async def handle_audio_message(
+    user: User, media_url: str, user_phone_number: str, work_prefix: str
+) -> None:
+    """
+    Download a voice note, translate it and reply per the user's output format.
+
+    Args:
+        user (User): The sender's settings.
+        media_url (str): Download URL of the voice note, or None if the
+            message carried no media ID.
+        user_phone_number (str): The sender's WhatsApp ID.
+        work_prefix (str): Per-message prefix for temporary file names.
+
+    Raises:
+        SpitchUnavailableError: If Spitch is timing out or the circuit is open.
+    """
+    if not media_url:
+        return
+
+    audio_bytes = await download_whatsapp_media(media_url)
+    audio_file = f"{work_prefix}.ogg"
+    output_wav = f"{work_prefix}.wav"
+    try:
+        # Write audio file safely
+        with open(audio_file, "wb") as f:
+            f.write(audio_bytes)
+
+        if user.output_format == "text":
+            text_response = await translator.voice_to_text_translator(
+                file_path=audio_file,
+                default_language=user.default_language,
+                output_language=user.output_language,
+            )
+            await send_message(message=text_response, phone_number=user_phone_number)
+        elif user.output_format == "audio":
+            status_audio = await translator.voice_to_voice_translator(
+                file_path=audio_file,
+                default_language=user.default_language,
+                output_language=user.output_language,
+                output_file=output_wav,
+            )
+            if status_audio:
+                await send_voice_message(output_wav, user_phone_number)
+            else:
+                await send_message(
+                    message="Error processing audio file",
+                    phone_number=user_phone_number,
+                )
+        else:
+            text_response = await translator.voice_to_text_translator(
+                file_path=audio_file,
+                default_language=user.default_language,
+                output_language=user.output_language,
+            )
+            status_audio = await translator.voice_to_voice_translator(
+                file_path=audio_file,
+                default_language=user.default_language,
+                output_language=user.output_language,
+                output_file=output_wav,
+            )
+            await send_message(message=text_response, phone_number=user_phone_number)
+            if status_audio:
+                await send_voice_message(output_wav, user_phone_number)
+            else:
+                await send_message(
+                    message="Error processing audio file",
+                    phone_number=user_phone_number,
+                )
+    finally:
+        # Clean up the downloaded voice note
+        cleanup_files(audio_file)
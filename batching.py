@@ -0,0 +1,176 @@
+"""
+batching.py
+
+This module micro-batches concurrent text translations. Requests for the same
+(source, target) pair that arrive within a short window are joined into one
+Spitch text.translate call and the result is split back to each caller.
+
+Spitch has no batch translate endpoint, so segments are joined with a
+delimiter line. If the translation comes back with a different number of
+segments, or the combined request is rejected (for example for being too
+long), the batch falls back to one request per text.
+"""
+
+import os
+import re
+import time
+import asyncio
+from collections import Counter
+from dotenv import load_dotenv
+
+from metrics import LatencyTracker
+from resilience import SpitchUnavailableError
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Batching window (milliseconds, 0 disables batching), maximum batch size
+# and maximum length of a combined request in characters
+SPITCH_BATCH_WINDOW_MS = float(os.getenv("SPITCH_BATCH_WINDOW_MS", 0))
+SPITCH_BATCH_MAX = int(os.getenv("SPITCH_BATCH_MAX", 8))
+SPITCH_BATCH_MAX_CHARS = int(os.getenv("SPITCH_BATCH_MAX_CHARS", 2000))
+
+# Segment delimiter used to join texts into one request
+SEGMENT_DELIMITER = "\n###\n"
+SEGMENT_SPLIT = re.compile(r"\s*###\s*")
+
+
+class TranslateBatcher:
+    """
+    Gathers pending translate requests per (source, target) pair and sends
+    them as one combined request when the window elapses or the batch is full.
+    """
+
+    def __init__(
+        self,
+        send,
+        window_ms: float = SPITCH_BATCH_WINDOW_MS,
+        max_size: int = SPITCH_BATCH_MAX,
+        max_chars: int = SPITCH_BATCH_MAX_CHARS,
+    ):
+        """
+        Initializes the batcher.
+
+        Args:
+            send: Coroutine function `send(text, source, target) -> str` that
+                performs a single translate request.
+            window_ms (float): How long to wait for more requests, in ms.
+                0 sends every request on its own.
+            max_size (int): Flush as soon as this many requests are pending.
+            max_chars (int): Flush before the combined text would exceed
+                this many characters. Longer texts are sent on their own.
+        """
+        self.send = send
+        self.window = window_ms / 1000
+        self.max_size = max(max_size, 1)
+        self.max_chars = max_chars
+        self._pending = {}
+        self._chars = {}
+        self._timers = {}
+        self.batch_sizes = Counter()
+        self.fallbacks = 0
+        self.queue_latency = LatencyTracker()
+        self.batch_latency = LatencyTracker()
+
+    async def translate(self, text: str, source: str, target: str) -> str:
+        """
+        Translates text, possibly as part of a batch.
+
+        Returns:
+            str: The translated text.
+        """
+        if self.window <= 0 or self.max_size == 1 or "###" in text or len(text) >= self.max_chars:
+            return await self.send(text, source, target)
+
+        key = (source, target)
+        if key in self._pending:
+            chars = self._chars[key] + len(SEGMENT_DELIMITER) + len(text)
+            if chars > self.max_chars:
+                self._flush(key)
+
+        future = asyncio.get_running_loop().create_future()
+        batch = self._pending.setdefault(key, [])
+        batch.append((text, future, time.monotonic()))
+        if len(batch) == 1:
+            self._chars[key] = len(text)
+        else:
+            self._chars[key] += len(SEGMENT_DELIMITER) + len(text)
+
+        if len(batch) >= self.max_size:
+            self._flush(key)
+        elif len(batch) == 1:
+            self._timers[key] = asyncio.get_running_loop().call_later(
+                self.window, self._flush, key
+            )
+        return await future
+
+    def _flush(self, key: tuple) -> None:
+        """
+        Takes the pending batch for a language pair and sends it.
+        """
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._pending.pop(key, None)
+        self._chars.pop(key, None)
+        if batch:
+            asyncio.ensure_future(self._send_batch(key, batch))
+
+    async def _send_batch(self, key: tuple, batch: list) -> None:
+        """
+        Sends one combined request and resolves each caller's future.
+        """
+        source, target = key
+        now = time.monotonic()
+        for _, _, queued_at in batch:
+            self.queue_latency.record(now - queued_at)
+        self.batch_sizes[len(batch)] += 1
+        texts = [text for text, _, _ in batch]
+
+        try:
+            if len(batch) == 1:
+                results = [await self.send(texts[0], source, target)]
+            else:
+                try:
+                    combined = await self.send(SEGMENT_DELIMITER.join(texts), source, target)
+                    results = SEGMENT_SPLIT.split(combined.strip())
+                    if len(results) != len(texts):
+                        print(f"Batch split mismatch ({len(results)} != {len(texts)}), retrying singly")
+                except SpitchUnavailableError:
+                    raise
+                except Exception as e:
+                    # A rejection of the combined text says nothing about
+                    # the individual texts, which may well succeed alone
+                    print(f"Batch request failed ({e}), retrying singly")
+                    results = None
+                if results is None or len(results) != len(texts):
+                    self.fallbacks += 1
+                    results = await asyncio.gather(
+                        *(self.send(text, source, target) for text in texts),
+                        return_exceptions=True,
+                    )
+        except Exception as e:
+            results = [e] * len(batch)
+        self.batch_latency.record(time.monotonic() - now)
+
+        for (_, future, _), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def stats(self) -> dict:
+        """
+        Returns batch size and latency metrics.
+        """
+        return {
+            "window_ms": self.window * 1000,
+            "max_size": self.max_size,
+            "max_chars": self.max_chars,
+            "batch_sizes": dict(self.batch_sizes),
+            "fallbacks": self.fallbacks,
+            "queue_latency": self.queue_latency.summary(),
+            "batch_latency": self.batch_latency.summary(),
+        }
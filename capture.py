@@ -0,0 +1,96 @@
+"""
+capture.py
+
+This module records incoming WhatsApp webhook payloads to an NDJSON file so
+real traffic can be replayed by loadtest.py. Payloads are anonymized before
+they are written: phone numbers and IDs are replaced with stable keyed
+hashes, every other string outside a small set of structural fields is
+masked while keeping its length, and numbers such as location coordinates
+are zeroed.
+"""
+
+import os
+import re
+import hmac
+import time
+import hashlib
+import threading
+import orjson
+
+# Fields holding phone numbers and opaque IDs, which are hashed
+PHONE_FIELDS = {"wa_id", "from", "recipient_id", "display_phone_number"}
+ID_FIELDS = {"id", "phone_number_id"}
+
+# Structural fields kept as they are; any other string or number is masked
+STRUCTURAL_FIELDS = {
+    "object",
+    "field",
+    "messaging_product",
+    "type",
+    "timestamp",
+    "status",
+    "mime_type",
+    "category",
+    "pricing_model",
+    "code",
+}
+
+
+class WebhookRecorder:
+    """
+    Appends anonymized webhook payloads to an NDJSON file, one per line:
+    {"t": <unix time>, "payload": {...}}.
+    """
+
+    def __init__(self, path: str, salt: str = None):
+        """
+        Initializes the recorder.
+
+        Args:
+            path (str): NDJSON file to append to.
+            salt (str): Key for hashing phone numbers and IDs. A random key
+                is used if not given, so hashes are only stable per process.
+        """
+        self.path = path
+        self._key = (salt or os.urandom(16).hex()).encode()
+        self._lock = threading.Lock()
+        self.recorded = 0
+
+    def _digest(self, value: str) -> str:
+        return hmac.new(self._key, str(value).encode(), hashlib.sha256).hexdigest()
+
+    def anonymize(self, node, key: str = None):
+        """
+        Returns a copy of a payload with personal data replaced.
+
+        Args:
+            node: The payload, or a nested value of it.
+            key (str): The dict key `node` was found under.
+        """
+        if isinstance(node, dict):
+            return {k: self.anonymize(v, k) for k, v in node.items()}
+        if isinstance(node, list):
+            return [self.anonymize(v, key) for v in node]
+        if key in STRUCTURAL_FIELDS or isinstance(node, bool) or node is None:
+            return node
+        if isinstance(node, (int, float)):
+            return 0
+        if key in PHONE_FIELDS:
+            # Fake numbers in an unassigned range, stable for the same input
+            return "999" + str(int(self._digest(node)[:15], 16))[-9:].zfill(9)
+        if key in ID_FIELDS:
+            return "anon." + self._digest(node)[:24]
+        return re.sub(r"\w", "x", node)
+
+    def record(self, payload: dict) -> None:
+        """
+        Anonymizes a payload and appends it to the capture file.
+
+        Args:
+            payload (dict): The parsed webhook payload.
+        """
+        line = orjson.dumps({"t": time.time(), "payload": self.anonymize(payload)})
+        with self._lock:
+            with open(self.path, "ab") as f:
+                f.write(line + b"\n")
+            self.recorded += 1
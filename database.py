@@ -7,8 +7,13 @@ from a .env file for configuration and ensures proper resource management.
 """
 
 import os
+import time
+import itertools
+import threading
+from collections import Counter, deque
+from contextlib import contextmanager
 from dotenv import load_dotenv
-from sqlalchemy import create_engine, Column, Integer, String
+from sqlalchemy import create_engine, text, Column, Integer, String
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
@@ -26,6 +31,12 @@ engine = create_engine(DATABASE_URL)
 # Create a configured "Session" class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Optional read replicas (comma-separated URLs) and routing configuration
+DB_REPLICA_URLS = [u.strip() for u in os.getenv("DB_REPLICA_URLS", "").split(",") if u.strip()]
+REPLICA_HEALTH_INTERVAL = float(os.getenv("DB_REPLICA_HEALTH_INTERVAL", 5))
+REPLICA_RYW_SECONDS = float(os.getenv("DB_REPLICA_RYW_SECONDS", 10))
+REPLICA_MAX_LAG = float(os.getenv("DB_REPLICA_MAX_LAG", REPLICA_RYW_SECONDS))
+
 # Base class for declarative class definitions
 Base = declarative_base()
 
@@ -68,4 +79,214 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+class Replica:
+    """
+    A read replica with its own engine, session factory and health state.
+    """
+
+    def __init__(self, name: str, url: str):
+        self.name = name
+        self.engine = create_engine(url, pool_pre_ping=True)
+        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        self.healthy = False
+        self.lag = None
+        self.last_error = None
+
+    def check(self, primary_lsns=None) -> None:
+        """
+        Runs a health check and, on PostgreSQL, measures replication lag.
+        The replica is marked unhealthy if the check fails or it lags more
+        than DB_REPLICA_MAX_LAG seconds behind the primary.
+
+        Args:
+            primary_lsns: Optional (monotonic time, WAL position) samples of
+                the primary, oldest first, recorded when the position changed.
+        """
+        try:
+            with self.engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+                lag = 0.0
+                if self.engine.dialect.name == "postgresql":
+                    lag = self._postgres_lag(conn, primary_lsns)
+                self.lag = float(lag) if lag is not None else None
+            self.healthy = self.lag is None or self.lag <= REPLICA_MAX_LAG
+            self.last_error = None if self.healthy else f"lag {self.lag:.1f}s"
+        except Exception as e:
+            self.healthy = False
+            self.last_error = str(e)[:200]
+
+    @staticmethod
+    def _postgres_lag(conn, primary_lsns):
+        """
+        Returns the replay lag in seconds.
+
+        With samples of the primary's WAL position the lag is how long the
+        primary has been ahead of the replayed position, which stays 0 while
+        the primary is idle. Without them, a streaming replica that has
+        replayed everything it received is caught up; otherwise the age of
+        the last replayed transaction is used, which also counts idle time
+        on the primary and so errs towards taking the replica out.
+        """
+        streaming, caught_up, replay_lsn, replay_age = conn.execute(text(
+            "SELECT EXISTS (SELECT 1 FROM pg_stat_wal_receiver WHERE status = 'streaming'), "
+            "pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn(), "
+            "pg_last_wal_replay_lsn() - '0/0'::pg_lsn, "
+            "EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())"
+        )).one()
+        if primary_lsns and replay_lsn is not None:
+            behind_since = next((t for t, lsn in primary_lsns if lsn > replay_lsn), None)
+            return 0.0 if behind_since is None else time.monotonic() - behind_since
+        if streaming and caught_up:
+            return 0.0
+        return replay_age
+
+
+class ReplicaRouter:
+    """
+    Routes read-only sessions round-robin across healthy replicas and
+    everything else to the primary.
+
+    A key (e.g. a phone number) written through the primary within the last
+    DB_REPLICA_RYW_SECONDS is read from the primary too, so a user who just
+    updated their settings sees them on their next message. The window is
+    shared between workers through Redis when `redis` is set, so a write
+    handled by one worker pins reads on all of them, with an in-process
+    copy as a fallback. Replicas lagging more than DB_REPLICA_MAX_LAG
+    (default: the same window) are taken out of rotation.
+    """
+
+    def __init__(self, urls: list, redis=None):
+        self.replicas = [Replica(f"replica{i}", url) for i, url in enumerate(urls)]
+        self.redis = redis
+        self._cycle = itertools.cycle(self.replicas) if self.replicas else None
+        self._recent_writes = {}
+        self._primary_lsns = deque(maxlen=1000)
+        self._lock = threading.Lock()
+        self.routes = Counter()
+        if self.replicas:
+            self.check_all()
+            threading.Thread(target=self._health_loop, name="replica-health", daemon=True).start()
+
+    def check_all(self) -> None:
+        """
+        Samples the primary's WAL position and health checks every replica
+        against it.
+        """
+        self._sample_primary()
+        for replica in self.replicas:
+            replica.check(self._primary_lsns)
+
+    def _sample_primary(self) -> None:
+        """
+        Records the primary's WAL position, with the time it was first seen,
+        whenever it has moved since the last sample.
+        """
+        if engine.dialect.name != "postgresql":
+            return
+        try:
+            with engine.connect() as conn:
+                lsn = conn.execute(text("SELECT pg_current_wal_lsn() - '0/0'::pg_lsn")).scalar()
+        except Exception as e:
+            print(f"Error sampling primary WAL position: {e}")
+            return
+        if not self._primary_lsns or self._primary_lsns[-1][1] != lsn:
+            self._primary_lsns.append((time.monotonic(), lsn))
+
+    def _health_loop(self) -> None:
+        while True:
+            time.sleep(REPLICA_HEALTH_INTERVAL)
+            self.check_all()
+
+    def mark_written(self, key: str) -> None:
+        """
+        Records a write for `key`, pinning its reads to the primary for the
+        read-your-writes window.
+        """
+        if not self.replicas:
+            return
+        if self.redis is not None:
+            try:
+                self.redis.set(f"ryw:{key}", 1, px=int(REPLICA_RYW_SECONDS * 1000))
+            except Exception as e:
+                print(f"Error storing read-your-writes marker: {e}")
+        now = time.monotonic()
+        with self._lock:
+            self._recent_writes[key] = now
+            # Drop expired entries so the map stays small
+            if len(self._recent_writes) > 10000:
+                self._recent_writes = {
+                    k: t for k, t in self._recent_writes.items() if now - t < REPLICA_RYW_SECONDS
+                }
+
+    def _written_recently(self, key: str) -> bool:
+        """
+        Checks whether `key` is inside its read-your-writes window. If Redis
+        cannot be reached the read goes to the primary to be safe.
+        """
+        written = self._recent_writes.get(key)
+        if written is not None and time.monotonic() - written < REPLICA_RYW_SECONDS:
+            return True
+        if self.redis is None:
+            return False
+        try:
+            return bool(self.redis.exists(f"ryw:{key}"))
+        except Exception as e:
+            print(f"Error reading read-your-writes marker: {e}")
+            return True
+
+    def choose(self, key: str = None):
+        """
+        Picks the session factory for a read.
+
+        Returns:
+            sessionmaker: A replica's session factory, or the primary's.
+        """
+        if not self.replicas:
+            return SessionLocal
+        if key is not None and self._written_recently(key):
+            self.routes["primary_read_your_writes"] += 1
+            return SessionLocal
+        with self._lock:
+            for _ in range(len(self.replicas)):
+                replica = next(self._cycle)
+                if replica.healthy:
+                    self.routes[replica.name] += 1
+                    return replica.SessionLocal
+        self.routes["primary_no_healthy_replica"] += 1
+        return SessionLocal
+
+    def stats(self) -> dict:
+        """
+        Returns replica health, lag and routing counts for metrics reporting.
+        """
+        return {
+            "replicas": {
+                r.name: {"healthy": r.healthy, "lag_seconds": r.lag, "last_error": r.last_error}
+                for r in self.replicas
+            },
+            "routes": dict(self.routes),
+        }
+
+
+# Router for read-only queries
+replica_router = ReplicaRouter(DB_REPLICA_URLS)
+
+@contextmanager
+def read_session(key: str = None):
+    """
+    Context manager that provides a session for read-only queries, routed
+    to a healthy replica unless `key` was written recently.
+
+    Args:
+        key (str): Optional read-your-writes key, e.g. the phone number.
+
+    Yields:
+        db (Session): SQLAlchemy database session.
+    """
+    db = replica_router.choose(key)()
+    try:
+        yield db
+    finally:
+        db.close()
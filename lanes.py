@@ -0,0 +1,134 @@
+"""
+lanes.py
+
+This module provides independently sized execution lanes so cheap text
+translations are not stuck behind slow voice-note work. Each lane has its own
+concurrency limit, waiting-queue bound and worker thread pool; blocking calls
+made while a lane is active run on that lane's threads. When a lane's queue is
+full, new jobs are rejected immediately so the caller can send a fast
+"try again" reply instead of queueing forever.
+"""
+
+import os
+import time
+import asyncio
+import functools
+import contextvars
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+
+from metrics import LatencyTracker
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Lane sizing
+TEXT_LANE_CONCURRENCY = int(os.getenv("TEXT_LANE_CONCURRENCY", 16))
+TEXT_LANE_QUEUE = int(os.getenv("TEXT_LANE_QUEUE", 100))
+AUDIO_LANE_CONCURRENCY = int(os.getenv("AUDIO_LANE_CONCURRENCY", 4))
+AUDIO_LANE_QUEUE = int(os.getenv("AUDIO_LANE_QUEUE", 20))
+
+# The lane the current task is running in, if any
+current_lane = contextvars.ContextVar("current_lane", default=None)
+
+
+class LaneFullError(Exception):
+    """
+    Raised when a lane's waiting queue is full and the job was not admitted.
+    """
+
+
+class Lane:
+    """
+    A bounded execution lane.
+
+    At most `concurrency` jobs run at once and at most `max_queue` jobs wait
+    for a slot. Blocking calls made through `run_blocking` inside the lane use
+    the lane's own thread pool.
+    """
+
+    def __init__(self, name: str, concurrency: int, max_queue: int):
+        """
+        Initializes the lane.
+
+        Args:
+            name (str): Lane name used in metrics and thread names.
+            concurrency (int): Maximum number of jobs running at once.
+            max_queue (int): Maximum number of jobs waiting for a slot.
+        """
+        self.name = name
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        # Two threads per job leaves room for a hedged duplicate request
+        self.executor = ThreadPoolExecutor(
+            max_workers=concurrency * 2, thread_name_prefix=f"lane-{name}"
+        )
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self.waiting = 0
+        self.active = 0
+        self.admitted = 0
+        self.shed = 0
+        self.wait_latency = LatencyTracker()
+
+    @asynccontextmanager
+    async def admit(self):
+        """
+        Waits for a slot in the lane and runs the block inside it.
+
+        Raises:
+            LaneFullError: If no slot is free and the waiting queue is
+                already at its bound.
+        """
+        if self._semaphore.locked() and self.waiting >= self.max_queue:
+            self.shed += 1
+            raise LaneFullError(f"{self.name} lane is full")
+
+        self.waiting += 1
+        start = time.monotonic()
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.wait_latency.record(time.monotonic() - start)
+
+        self.admitted += 1
+        self.active += 1
+        token = current_lane.set(self)
+        try:
+            yield self
+        finally:
+            current_lane.reset(token)
+            self.active -= 1
+            self._semaphore.release()
+
+    def stats(self) -> dict:
+        """
+        Returns the lane's depth and wait times for metrics reporting.
+        """
+        return {
+            "concurrency": self.concurrency,
+            "max_queue": self.max_queue,
+            "active": self.active,
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "shed": self.shed,
+            "wait": self.wait_latency.summary(),
+        }
+
+
+text_lane = Lane("text", TEXT_LANE_CONCURRENCY, TEXT_LANE_QUEUE)
+audio_lane = Lane("audio", AUDIO_LANE_CONCURRENCY, AUDIO_LANE_QUEUE)
+
+
+async def run_blocking(func, /, *args, **kwargs):
+    """
+    Runs a blocking callable in a worker thread and awaits its result.
+
+    The thread comes from the current lane's pool, or the event loop's
+    default executor when called outside a lane.
+    """
+    lane = current_lane.get()
+    executor = lane.executor if lane is not None else None
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, functools.partial(func, *args, **kwargs))
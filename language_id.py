@@ -0,0 +1,214 @@
+"""
+language_id.py
+
+This module provides a lightweight local language identifier for the
+languages Wazobia supports (English, Igbo, Yoruba and Hausa). It is a
+character n-gram naive Bayes model built at import time from the seed text
+below, with a bonus for letters that only one of the languages uses. A
+detection takes well under a millisecond, so it can run before every
+translation to skip or correct requests that would otherwise waste a Spitch
+round trip.
+"""
+
+import os
+import re
+import math
+import unicodedata
+from collections import Counter
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Detection configuration
+LANGID_ENABLED = os.getenv("LANGID_ENABLED", "True") == "True"
+LANGID_CONFIDENCE = float(os.getenv("LANGID_CONFIDENCE", 0.9))
+LANGID_MIN_LETTERS = int(os.getenv("LANGID_MIN_LETTERS", 10))
+
+# Seed text per language code
+SEED_TEXT = {
+    "en": """
+        Good morning, how are you doing today? I am going to the market to buy
+        some food. Please can you help me translate this message. Thank you very
+        much for your help, my friend. Where is the nearest hospital? What time
+        is the meeting tomorrow? I will call you when I get home this evening.
+        My mother said that we should come and eat with them on Sunday. The
+        children are going to school in the morning. We need to talk about the
+        money and the work that is left. Do you know the way to the bus station?
+        I love you and I miss you so much. Happy birthday, may God bless you.
+        The weather is very hot today and there is no light. Send me the price
+        of the rice and the beans. What is your name? My father is at home.
+        Goodbye, we will see each other tomorrow. They have not finished the
+        job yet because the shop was closed. Which of these would you like?
+    """,
+    "yo": """
+        Ẹ kú àárọ̀, ṣé dáadáa ni? Mo fẹ́ lọ sí ọjà láti ra oúnjẹ. Jọ̀wọ́ ràn mí
+        lọ́wọ́ láti túmọ̀ ọ̀rọ̀ yìí. Ẹ ṣé púpọ̀ fún ìrànlọ́wọ́ yín, ọ̀rẹ́ mi. Níbo
+        ni ilé ìwòsàn tó súnmọ́ jù wà? Àkókò wo ni ìpàdé ọ̀la? Màá pè ọ́ nígbà
+        tí mo bá dé ilé ní ìrọ̀lẹ́ yìí. Ìyá mi sọ pé ká wá jẹun pẹ̀lú wọn ní ọjọ́
+        Àìkú. Àwọn ọmọ ń lọ sí ilé ìwé ní òwúrọ̀. A ní láti sọ̀rọ̀ nípa owó àti
+        iṣẹ́ tó kù. Ṣé o mọ ọ̀nà sí ibùdó ọkọ̀? Mo nífẹ̀ẹ́ rẹ, àárò rẹ ń sọ mí
+        gan-an. Ẹ kú ọjọ́ ìbí, kí Ọlọ́run bù kún ọ. Oòrùn mú gan-an lónìí, kò sí
+        iná. Fi iye owó ìrẹsì àti ẹ̀wà ránṣẹ́ sí mi. Kí ni orúkọ rẹ? Bàbá mi wà
+        nílé. Ó dàbọ̀, a ó rí ara wa lọ́la. Wọn kò tíì parí iṣẹ́ náà nítorí pé
+        ṣọ́ọ̀bù ti tì. Èwo nínú àwọn wọ̀nyí ni o fẹ́?
+    """,
+    "ig": """
+        Ụtụtụ ọma, kedu ka ị mere taa? Ana m aga ahịa ịzụta nri. Biko nyere m
+        aka ịsụgharị ozi a. Daalụ nke ukwuu maka enyemaka gị, enyi m. Ebee ka
+        ụlọ ọgwụ kacha nso dị? Kedu oge nzukọ echi ga-amalite? M ga-akpọ gị
+        mgbe m rutere ụlọ n'anyasị a. Nne m kwuru na anyị ga-abịa rie nri na ha
+        n'ụbọchị Sọnde. Ụmụaka na-aga ụlọ akwụkwọ n'ụtụtụ. Anyị kwesịrị ikwu
+        maka ego na ọrụ fọdụrụ. Ị maara ụzọ ga-aga ebe ụgbọ ala na-akwụsị? A
+        hụrụ m gị n'anya, agụụ gị na-agụ m nke ukwuu. Ezi ụbọchị ọmụmụ, Chineke
+        gọzie gị. Anwụ na-acha nke ukwuu taa, ọ nweghị ọkụ. Zitere m ọnụahịa
+        osikapa na agwa. Gịnị bụ aha gị? Nna m nọ n'ụlọ. Ka ọ dị, anyị ga-ahụ
+        echi. Ha emechabeghị ọrụ ahụ n'ihi na emechiri ụlọ ahịa. Kedu nke n'ime
+        ndị a ị chọrọ?
+    """,
+    "ha": """
+        Ina kwana, yaya kake yau? Zan tafi kasuwa in sayo abinci. Don Allah ka
+        taimaka min in fassara wannan saƙo. Na gode sosai da taimakonka,
+        abokina. Ina asibiti mafi kusa yake? Wane lokaci ne taron gobe? Zan
+        kira ka idan na dawo gida da yammacin nan. Mahaifiyata ta ce mu zo mu
+        ci abinci tare da su ranar Lahadi. Yara suna zuwa makaranta da safe.
+        Muna bukatar mu yi magana game da kuɗi da aikin da ya rage. Ka san
+        hanyar zuwa tashar mota? Ina son ki kuma ina kewarki sosai. Barka da
+        ranar haihuwa, Allah ya albarkace ka. Akwai zafi sosai yau kuma babu
+        wuta. Aiko min da farashin shinkafa da wake. Menene sunanka? Babana
+        yana gida. Sai anjima, za mu gan ka gobe. Ba su gama aikin ba tukuna
+        saboda an rufe shagon. Wanne daga cikin waɗannan kake so?
+    """,
+}
+
+# Letters used by only one of the languages, and the score bonus each
+# occurrence earns (checked before diacritics are stripped)
+DISTINCTIVE_LETTERS = {
+    "yo": "ẹṣ",
+    "ig": "ịụṅ",
+    "ha": "ɓɗƙƴ",
+}
+DISTINCTIVE_BONUS = 0.1
+
+# Sharpness of the softmax over per-n-gram average log probabilities. A
+# margin of about 0.25 between the top two languages gives ~0.9 confidence.
+CONFIDENCE_SCALE = 12.0
+
+NGRAM_SIZES = (1, 2, 3)
+WORD_PATTERN = re.compile(r"[^\W\d_]+(?:'[^\W\d_]+)?")
+
+
+def _normalize(text: str) -> str:
+    """
+    Lowercases text and strips tone marks and dots below, since users often
+    type without them.
+    """
+    decomposed = unicodedata.normalize("NFD", text.lower())
+    stripped = "".join(ch for ch in decomposed if unicodedata.category(ch) != "Mn")
+    return stripped.translate(str.maketrans("ɓɗƙƴ", "bdky"))
+
+
+def _ngrams(text: str):
+    """
+    Yields character n-grams of each word, padded with spaces.
+    """
+    for word in WORD_PATTERN.findall(_normalize(text)):
+        padded = f" {word} "
+        for n in NGRAM_SIZES:
+            for i in range(len(padded) - n + 1):
+                yield padded[i:i + n]
+
+
+class LanguageIdentifier:
+    """
+    Character n-gram naive Bayes language identifier.
+    """
+
+    def __init__(self, seed_text: dict = SEED_TEXT):
+        """
+        Builds per-language n-gram log probabilities from seed text.
+
+        Args:
+            seed_text (dict): Training text keyed by language code.
+        """
+        counts = {lang: Counter(_ngrams(text)) for lang, text in seed_text.items()}
+        vocabulary = set().union(*counts.values())
+        self.log_probs = {}
+        self.unseen = {}
+        for lang, grams in counts.items():
+            total = sum(grams.values()) + len(vocabulary) + 1
+            self.log_probs[lang] = {g: math.log((c + 1) / total) for g, c in grams.items()}
+            self.unseen[lang] = math.log(1 / total)
+
+    def detect(self, text: str):
+        """
+        Identifies the language of a text.
+
+        Args:
+            text (str): The text to identify.
+
+        Returns:
+            tuple: (language code, confidence between 0 and 1), or
+            (None, 0.0) if the text has too few letters to judge.
+        """
+        if sum(ch.isalpha() for ch in text) < LANGID_MIN_LETTERS:
+            return None, 0.0
+
+        grams = list(_ngrams(text))
+        if not grams:
+            return None, 0.0
+
+        # Average log probability per n-gram, so confidence does not grow
+        # with message length alone
+        scores = {}
+        for lang, log_probs in self.log_probs.items():
+            unseen = self.unseen[lang]
+            scores[lang] = sum(log_probs.get(gram, unseen) for gram in grams) / len(grams)
+
+        lowered = unicodedata.normalize("NFC", text.lower())
+        for lang, letters in DISTINCTIVE_LETTERS.items():
+            hits = sum(lowered.count(letter) for letter in letters)
+            scores[lang] += DISTINCTIVE_BONUS * min(hits, 5)
+
+        # Softmax over the scaled scores
+        best = max(scores, key=scores.get)
+        total = sum(
+            math.exp(CONFIDENCE_SCALE * (score - scores[best])) for score in scores.values()
+        )
+        return best, 1 / total
+
+
+identifier = LanguageIdentifier()
+stats = Counter()
+
+
+def resolve_languages(text: str, source: str, target: str):
+    """
+    Checks a text's language before translating it.
+
+    Args:
+        text (str): The text to be translated.
+        source (str): The user's configured source language.
+        target (str): The target language.
+
+    Returns:
+        tuple: (source, skip). `source` is corrected when the text is
+        confidently in another language, and `skip` is True when it is
+        confidently already in the target language.
+    """
+    if not LANGID_ENABLED:
+        return source, False
+
+    language, confidence = identifier.detect(text)
+    if language is None or confidence < LANGID_CONFIDENCE:
+        stats["undecided"] += 1
+        return source, False
+    if language == target:
+        stats["skipped"] += 1
+        return source, True
+    if language != source:
+        stats["corrected"] += 1
+        print(f"Detected {language} ({confidence:.2f}) instead of {source}")
+        return language, False
+    stats["confirmed"] += 1
+    return source, False
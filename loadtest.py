@@ -0,0 +1,529 @@
+"""
+loadtest.py
+
+End-to-end load test harness for the Wazobia webhook.
+
+It replays webhook payloads recorded by capture.py (set WEBHOOK_CAPTURE_FILE
+on a running app) against an app instance whose Graph API and Spitch calls
+point at local stand-ins. The stand-ins inject realistic latency and error
+rates and record every outbound reply, so the report covers acknowledgement
+latency, reply latency and the effect of WhatsApp-style redelivery.
+
+Usage:
+    # 1. Start the app pointed at the stand-ins
+    WA_GRAPH_URL=http://127.0.0.1:9100/graph \\
+    SPITCH_BASE_URL=http://127.0.0.1:9100/spitch \\
+    uvicorn app:app --port 8000
+
+    # 2. Replay a capture at 2x its recorded speed (stand-ins run in-process)
+    python loadtest.py replay capture.ndjson --app http://127.0.0.1:8000 --speed 2
+
+    # Or at a fixed rate, looping the capture for 60 seconds
+    python loadtest.py replay capture.ndjson --rate 50 --loops 100 --duration 60
+
+    # Serve the stand-ins on their own, e.g. for manual testing
+    python loadtest.py stubs --port 9100
+"""
+
+import io
+import math
+import time
+import uuid
+import wave
+import random
+import asyncio
+import argparse
+from collections import Counter, defaultdict, deque
+
+import httpx
+import orjson
+import uvicorn
+from fastapi import FastAPI, Request, Response
+
+from metrics import LatencyTracker
+
+
+class StubProfile:
+    """
+    Latency and error behaviour of one stand-in endpoint.
+
+    Latency is log-normal around `median_ms`, so most calls are close to the
+    median with an occasional slow tail.
+    """
+
+    def __init__(self, median_ms: float, sigma: float = 0.5, error_rate: float = 0.0):
+        self.median_ms = median_ms
+        self.sigma = sigma
+        self.error_rate = error_rate
+
+    async def delay(self) -> None:
+        """
+        Sleeps for one latency sample.
+        """
+        await asyncio.sleep(self.median_ms * math.exp(random.gauss(0, self.sigma)) / 1000)
+
+    def should_fail(self) -> bool:
+        """
+        Returns True if this call should return an injected error.
+        """
+        return random.random() < self.error_rate
+
+
+def silent_wav(seconds: float = 1.0, rate: int = 16000) -> bytes:
+    """
+    Returns a valid mono 16-bit WAV file of silence.
+    """
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(b"\x00\x00" * int(seconds * rate))
+    return buf.getvalue()
+
+
+def build_stub_app(profiles: dict, on_reply=None) -> FastAPI:
+    """
+    Builds a FastAPI app standing in for the Graph API (under /graph) and
+    Spitch (under /spitch).
+
+    Args:
+        profiles (dict): StubProfile per endpoint name: "graph",
+            "translate", "transcribe" and "speech".
+        on_reply: Optional callback(phone_number, message_type) invoked for
+            every message the app sends.
+
+    Returns:
+        FastAPI: The stand-in app. Call counts are kept in `app.state.calls`
+        and injected errors in `app.state.errors`.
+    """
+    stub = FastAPI()
+    stub.state.calls = Counter()
+    stub.state.errors = Counter()
+    wav_bytes = silent_wav()
+    ogg_bytes = b"OggS" + bytes(16 * 1024)
+
+    async def simulate(name: str):
+        stub.state.calls[name] += 1
+        profile = profiles[name]
+        await profile.delay()
+        if profile.should_fail():
+            stub.state.errors[name] += 1
+            return Response(
+                content=orjson.dumps({"error": {"message": "injected failure"}}),
+                status_code=500,
+                media_type="application/json",
+            )
+        return None
+
+    @stub.get("/graph/media/{media_id}")
+    async def download_media(media_id: str):
+        failure = await simulate("graph")
+        return failure or Response(content=ogg_bytes, media_type="audio/ogg")
+
+    @stub.get("/graph/{version}/{media_id}")
+    async def media_info(media_id: str, request: Request):
+        failure = await simulate("graph")
+        return failure or {"url": f"{str(request.base_url).rstrip('/')}/graph/media/{media_id}"}
+
+    @stub.post("/graph/{version}/{phone_id}/media")
+    async def upload_media(request: Request):
+        await request.body()
+        failure = await simulate("graph")
+        return failure or {"id": f"media.{uuid.uuid4().hex[:12]}"}
+
+    @stub.post("/graph/{version}/{phone_id}/messages")
+    async def send(request: Request):
+        payload = orjson.loads(await request.body())
+        failure = await simulate("graph")
+        if failure:
+            return failure
+        if on_reply is not None:
+            on_reply(payload.get("to"), payload.get("type"))
+        return {"messages": [{"id": f"wamid.{uuid.uuid4().hex[:16]}"}]}
+
+    @stub.post("/spitch/v1/translate")
+    async def translate(request: Request):
+        body = orjson.loads(await request.body())
+        failure = await simulate("translate")
+        return failure or {"request_id": uuid.uuid4().hex, "text": body.get("text", "")}
+
+    @stub.post("/spitch/v1/transcriptions")
+    async def transcribe(request: Request):
+        await request.body()
+        failure = await simulate("transcribe")
+        return failure or {"request_id": uuid.uuid4().hex, "text": "stub transcription"}
+
+    @stub.post("/spitch/v1/speech")
+    async def speech(request: Request):
+        await request.body()
+        failure = await simulate("speech")
+        return failure or Response(content=wav_bytes, media_type="audio/wav")
+
+    return stub
+
+
+def load_capture(path: str) -> list:
+    """
+    Reads an NDJSON capture file.
+
+    Returns:
+        list: (recorded unix time, payload) tuples in file order.
+    """
+    events = []
+    with open(path, "rb") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                record = orjson.loads(line)
+                events.append((record.get("t", 0.0), record["payload"]))
+    return events
+
+
+def message_recipients(payload: dict) -> list:
+    """
+    Returns (message id, sender wa_id) pairs for a payload that carries
+    messages, i.e. the messages the app is expected to reply to.
+    """
+    recipients = []
+    for entry in payload.get("entry") or []:
+        for change in entry.get("changes") or []:
+            value = change.get("value") or {}
+            contacts = [c["wa_id"] for c in value.get("contacts") or [] if c.get("wa_id")]
+            for message, phone_number in zip(value.get("messages") or [], contacts):
+                recipients.append((message.get("id"), phone_number))
+    return recipients
+
+
+def retag_message_ids(payload: dict, tag: str) -> dict:
+    """
+    Returns a copy of a payload with message IDs made unique for this replay
+    pass, so the app's dedup does not swallow looped or repeated runs.
+    """
+    payload = orjson.loads(orjson.dumps(payload))
+    for entry in payload.get("entry") or []:
+        for change in entry.get("changes") or []:
+            for message in (change.get("value") or {}).get("messages") or []:
+                if message.get("id"):
+                    message["id"] = f"{message['id']}.{tag}"
+    return payload
+
+
+# Outbound message types the app sends per message for each output format,
+# in order. Failed voice replies are replaced by an error text.
+REPLY_TYPES = {"text": ("text",), "audio": ("audio",), "both": ("text", "audio")}
+
+
+class ReplayStats:
+    """
+    Collects acknowledgement, reply and redelivery statistics for a replay.
+    """
+
+    def __init__(self):
+        self.sent = 0
+        self.acked = 0
+        self.redeliveries = 0
+        self.gave_up = 0
+        self.errors = Counter()
+        self.ack_latency = LatencyTracker(window=None)
+        self.reply_latency = LatencyTracker(window=None)
+        self.expected_replies = 0
+        self.first_replies = 0
+        self.follow_up_replies = 0
+        self.extra_replies = 0
+        self.unmatched_replies = 0
+        self.started = None
+        self.last_ack = None
+        # Output format per seeded user, used to know how many replies to expect
+        self.formats = {}
+        # Per recipient: [first send time, replies seen, expected reply types]
+        # for each message; a None type matches any reply
+        self._awaiting = defaultdict(deque)
+
+    def expect_reply(self, phone_number: str, sent_at: float) -> None:
+        """
+        Registers a message that should be answered by the app.
+        """
+        self.expected_replies += 1
+        types = REPLY_TYPES.get(self.formats.get(phone_number), (None,))
+        self._awaiting[phone_number].append([sent_at, 0, types])
+
+    def on_reply(self, phone_number: str, message_type: str) -> None:
+        """
+        Matches an outbound message seen by the Graph stand-in to the oldest
+        message from the same user whose next expected reply has that type,
+        or failing that (e.g. an error text in place of a voice note) to the
+        oldest message still missing a reply. Only the first reply to a
+        message counts towards reply latency; later ones are follow-ups.
+        """
+        awaiting = self._awaiting.get(phone_number)
+        if not awaiting:
+            self.unmatched_replies += 1
+            return
+
+        incomplete = [pending for pending in awaiting if pending[1] < len(pending[2])]
+        match = next(
+            (p for p in incomplete if p[2][p[1]] in (message_type, None)),
+            incomplete[0] if incomplete else None,
+        )
+        if match is None:
+            self.extra_replies += 1
+            return
+        if match[1] == 0:
+            self.first_replies += 1
+            self.reply_latency.record(time.monotonic() - match[0])
+        else:
+            self.follow_up_replies += 1
+        match[1] += 1
+
+    def report(self, stub: FastAPI) -> dict:
+        """
+        Returns the replay results.
+        """
+        elapsed = (self.last_ack or time.monotonic()) - (self.started or time.monotonic())
+        return {
+            "sent": self.sent,
+            "acked": self.acked,
+            "throughput_rps": round(self.acked / elapsed, 2) if elapsed > 0 else None,
+            "ack_latency": self.ack_latency.summary(),
+            "reply_latency": self.reply_latency.summary(),
+            "errors": dict(self.errors),
+            "redeliveries": self.redeliveries,
+            "gave_up": self.gave_up,
+            "replies": {
+                "expected": self.expected_replies,
+                "answered": self.first_replies,
+                "unanswered": self.expected_replies - self.first_replies,
+                "follow_ups": self.follow_up_replies,
+                "extra": self.extra_replies,
+                "unmatched": self.unmatched_replies,
+            },
+            "stubs": {
+                "calls": dict(stub.state.calls),
+                "injected_errors": dict(stub.state.errors),
+            },
+        }
+
+
+async def deliver(client: httpx.AsyncClient, args, payload: dict, stats: ReplayStats) -> None:
+    """
+    POSTs one payload to the app, redelivering it with exponential backoff
+    the way WhatsApp does when the webhook fails or is too slow.
+    """
+    body = orjson.dumps(payload)
+    for attempt in range(args.max_redeliveries + 1):
+        if attempt:
+            stats.redeliveries += 1
+            await asyncio.sleep(args.redelivery_backoff * 2 ** (attempt - 1))
+        stats.sent += 1
+        start = time.monotonic()
+        try:
+            response = await client.post(
+                f"{args.app}/webhook",
+                content=body,
+                headers={"Content-Type": "application/json"},
+                timeout=args.ack_timeout,
+            )
+        except httpx.TimeoutException:
+            stats.errors["timeout"] += 1
+            continue
+        except httpx.HTTPError as e:
+            stats.errors[type(e).__name__] += 1
+            continue
+        if response.status_code == 200:
+            stats.acked += 1
+            stats.last_ack = time.monotonic()
+            stats.ack_latency.record(stats.last_ack - start)
+            return
+        stats.errors[f"http_{response.status_code}"] += 1
+    stats.gave_up += 1
+
+
+async def seed_users(client: httpx.AsyncClient, args, events: list, stats: ReplayStats) -> None:
+    """
+    Signs up every sender in the capture so replayed messages reach the
+    translation path instead of the signup reply. Each user's output format
+    is kept in `stats` to know how many replies their messages get.
+    """
+    mix = []
+    for part in args.format_mix.split(","):
+        name, weight = part.split("=")
+        mix.append((name.strip(), float(weight)))
+    formats, weights = zip(*mix)
+
+    phone_numbers = {
+        phone for _, payload in events for _, phone in message_recipients(payload)
+    }
+    for phone_number in sorted(phone_numbers):
+        output_format = random.choices(formats, weights)[0]
+        stats.formats[phone_number] = output_format
+        await client.post(
+            f"{args.app}/signup",
+            json={
+                "first_name": "Load",
+                "last_name": "Test",
+                "phone_number": phone_number,
+                "default_language": args.source_language,
+                "output_language": args.target_language,
+                "output_format": output_format,
+            },
+        )
+    print(f"Seeded {len(phone_numbers)} users")
+
+
+def schedule(args, events: list) -> list:
+    """
+    Returns (offset seconds, payload) pairs for the replay.
+
+    Offsets follow the recorded inter-arrival times divided by `--speed`,
+    or a fixed `--rate` if given. The capture is repeated `--loops` times
+    and cut off at `--duration` seconds.
+    """
+    if not events:
+        return []
+    run_tag = uuid.uuid4().hex[:8]
+    first = events[0][0]
+    if args.rate:
+        offsets = [i / args.rate for i in range(len(events))]
+        span = len(events) / args.rate
+    else:
+        offsets = [(t - first) / args.speed for t, _ in events]
+        span = offsets[-1] + (offsets[-1] / max(len(events) - 1, 1))
+
+    plan = []
+    for loop in range(args.loops):
+        for offset, (_, payload) in zip(offsets, events):
+            at = loop * span + offset
+            if args.duration and at > args.duration:
+                return plan
+            plan.append((at, retag_message_ids(payload, f"{run_tag}.{loop}")))
+    return plan
+
+
+def build_profiles(args) -> dict:
+    """
+    Builds the stand-in latency/error profiles from the command line.
+    """
+    return {
+        "graph": StubProfile(args.graph_ms, args.sigma, args.graph_errors),
+        "translate": StubProfile(args.translate_ms, args.sigma, args.spitch_errors),
+        "transcribe": StubProfile(args.transcribe_ms, args.sigma, args.spitch_errors),
+        "speech": StubProfile(args.speech_ms, args.sigma, args.spitch_errors),
+    }
+
+
+async def replay(args) -> dict:
+    """
+    Runs a replay with in-process stand-ins and returns the report.
+    """
+    stats = ReplayStats()
+    stub = build_stub_app(build_profiles(args), on_reply=stats.on_reply)
+    server = uvicorn.Server(
+        uvicorn.Config(stub, host=args.stub_host, port=args.stub_port, log_level="warning")
+    )
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    events = load_capture(args.capture)
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(limits=limits) as client:
+        if args.seed_users:
+            await seed_users(client, args, events, stats)
+
+        plan = schedule(args, events)
+        print(f"Replaying {len(plan)} payloads against {args.app}")
+        stats.started = time.monotonic()
+        tasks = []
+        seen = set()
+        for at, payload in plan:
+            delay = stats.started + at - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            # Recorded redeliveries repeat a message ID and expect no new reply
+            for message_id, phone_number in message_recipients(payload):
+                if message_id not in seen:
+                    seen.add(message_id)
+                    stats.expect_reply(phone_number, time.monotonic())
+            tasks.append(asyncio.create_task(deliver(client, args, payload, stats)))
+        await asyncio.gather(*tasks)
+
+    # Give the app time to finish sending replies for the last messages
+    deadline = time.monotonic() + args.drain
+    while stats.first_replies < stats.expected_replies and time.monotonic() < deadline:
+        await asyncio.sleep(0.2)
+
+    server.should_exit = True
+    await server_task
+    return stats.report(stub)
+
+
+def print_report(report: dict) -> None:
+    """
+    Prints a replay report in a readable form.
+    """
+    print(f"Sent: {report['sent']}  Acked: {report['acked']}  "
+          f"Throughput: {report['throughput_rps']} req/s")
+    for name in ("ack_latency", "reply_latency"):
+        latency = report[name]
+        print(f"{name}: p50={latency['p50_ms']}ms p95={latency['p95_ms']}ms "
+              f"p99={latency['p99_ms']}ms")
+    print(f"Errors: {report['errors']}")
+    print(f"Redeliveries: {report['redeliveries']}  Gave up: {report['gave_up']}")
+    print(f"Replies: {report['replies']}")
+    print(f"Stand-ins: {report['stubs']}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Wazobia webhook load test harness")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def add_stub_args(p):
+        p.add_argument("--graph-ms", type=float, default=120, help="median Graph API latency")
+        p.add_argument("--translate-ms", type=float, default=300, help="median translate latency")
+        p.add_argument("--transcribe-ms", type=float, default=1500, help="median transcription latency")
+        p.add_argument("--speech-ms", type=float, default=1200, help="median TTS latency")
+        p.add_argument("--sigma", type=float, default=0.5, help="log-normal latency spread")
+        p.add_argument("--graph-errors", type=float, default=0.01, help="Graph API error rate")
+        p.add_argument("--spitch-errors", type=float, default=0.01, help="Spitch error rate")
+
+    stubs = sub.add_parser("stubs", help="serve the Graph API and Spitch stand-ins")
+    stubs.add_argument("--host", default="127.0.0.1")
+    stubs.add_argument("--port", type=int, default=9100)
+    add_stub_args(stubs)
+
+    rep = sub.add_parser("replay", help="replay a capture against a running app")
+    rep.add_argument("capture", help="NDJSON file written by WEBHOOK_CAPTURE_FILE")
+    rep.add_argument("--app", default="http://127.0.0.1:8000", help="base URL of the app")
+    rep.add_argument("--speed", type=float, default=1.0, help="multiplier on recorded pace")
+    rep.add_argument("--rate", type=float, help="fixed payloads per second instead")
+    rep.add_argument("--loops", type=int, default=1, help="times to repeat the capture")
+    rep.add_argument("--duration", type=float, help="stop scheduling after N seconds")
+    rep.add_argument("--concurrency", type=int, default=200, help="max open connections")
+    rep.add_argument("--ack-timeout", type=float, default=20, help="seconds before redelivery")
+    rep.add_argument("--max-redeliveries", type=int, default=3)
+    rep.add_argument("--redelivery-backoff", type=float, default=1.0, help="first backoff seconds")
+    rep.add_argument("--drain", type=float, default=30, help="seconds to wait for late replies")
+    rep.add_argument("--seed-users", action="store_true", help="sign up all senders first")
+    rep.add_argument("--format-mix", default="text=0.8,audio=0.1,both=0.1")
+    rep.add_argument("--source-language", default="en")
+    rep.add_argument("--target-language", default="yo")
+    rep.add_argument("--stub-host", default="127.0.0.1")
+    rep.add_argument("--stub-port", type=int, default=9100)
+    rep.add_argument("--report", help="also write the report as JSON to this file")
+    add_stub_args(rep)
+
+    args = parser.parse_args()
+    if args.command == "stubs":
+        uvicorn.run(build_stub_app(build_profiles(args)), host=args.host, port=args.port)
+        return
+
+    report = asyncio.run(replay(args))
+    print_report(report)
+    if args.report:
+        with open(args.report, "wb") as f:
+            f.write(orjson.dumps(report, option=orjson.OPT_INDENT_2))
+
+
+if __name__ == "__main__":
+    main()
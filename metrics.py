@@ -0,0 +1,52 @@
+"""
+metrics.py
+
+This module provides small in-process helpers for collecting runtime
+metrics, such as rolling latency windows, which are reported by the
+application's /metrics endpoint.
+"""
+
+import threading
+from collections import deque
+
+
+class LatencyTracker:
+    """
+    Keeps a rolling window of latencies (seconds) to estimate percentiles.
+    """
+
+    def __init__(self, window: int = 200):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        """
+        Adds a latency sample (seconds).
+        """
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, pct: float, min_samples: int = 1):
+        """
+        Returns the given percentile of the window, or None if there are
+        fewer than `min_samples` samples.
+        """
+        with self._lock:
+            samples = sorted(self._samples)
+        if len(samples) < max(min_samples, 1):
+            return None
+        index = min(len(samples) - 1, int(round(pct / 100 * (len(samples) - 1))))
+        return samples[index]
+
+    def summary(self) -> dict:
+        """
+        Returns p50/p95/p99 of the window in milliseconds.
+        """
+        def ms(value):
+            return None if value is None else round(value * 1000, 2)
+
+        return {
+            "p50_ms": ms(self.percentile(50)),
+            "p95_ms": ms(self.percentile(95)),
+            "p99_ms": ms(self.percentile(99)),
+        }
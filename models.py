@@ -3,6 +3,20 @@ from dotenv import load_dotenv
 from spitch import Spitch
 import ffmpeg
 
+from lanes import run_blocking
+from batching import TranslateBatcher
+from language_id import resolve_languages
+from resilience import (
+    SPITCH_TRANSLATE_TIMEOUT,
+    SPITCH_TRANSCRIBE_TIMEOUT,
+    SPITCH_TTS_TIMEOUT,
+    SPITCH_HEDGE_TRANSLATE,
+    SpitchUnavailableError,
+    call_with_timeout,
+    hedged_call,
+    translate_latency,
+)
+
 # Load environment variables from a .env file
 load_dotenv()
 
@@ -16,18 +30,90 @@ class Translator:
     Translator class provides methods for translating text and speech
     between different languages using the Spitch API. It also includes
     methods for converting audio files to different formats.
+
+    All Spitch calls go through the resilience layer, so they run off the
+    event loop with per-operation timeouts and share one circuit breaker.
     """
 
     def __init__(self):
         """
         Initializes the Translator with a Spitch client.
         """
-        self.client = Spitch()
+        # No SDK retries, so an operation timeout also frees its worker thread
+        self.client = Spitch(max_retries=0)
+        self.batcher = TranslateBatcher(self._send_translate)
+
+    async def _translate(self, text: str, source: str, target: str) -> str:
+        """
+        Translates text, micro-batching concurrent requests for the same
+        language pair if batching is enabled.
+
+        Returns:
+            str: The translated text.
+        """
+        return await self.batcher.translate(text, source, target)
+
+    async def _send_translate(self, text: str, source: str, target: str) -> str:
+        """
+        Calls Spitch text.translate, hedging the request if enabled.
+
+        Returns:
+            str: The translated text.
+        """
+        kwargs = dict(text=text, source=source, target=target, timeout=SPITCH_TRANSLATE_TIMEOUT)
+        if SPITCH_HEDGE_TRANSLATE:
+            translation = await hedged_call(
+                SPITCH_TRANSLATE_TIMEOUT, translate_latency, self.client.text.translate, **kwargs
+            )
+        else:
+            translation = await call_with_timeout(
+                SPITCH_TRANSLATE_TIMEOUT,
+                self.client.text.translate,
+                tracker=translate_latency,
+                **kwargs,
+            )
+        return translation.text
+
+    async def _transcribe(self, content: bytes, language: str) -> str:
+        """
+        Calls Spitch speech.transcribe with the transcription timeout.
+
+        Returns:
+            str: The transcribed text.
+        """
+        transcription = await call_with_timeout(
+            SPITCH_TRANSCRIBE_TIMEOUT,
+            self.client.speech.transcribe,
+            language=language,
+            content=content,
+            timeout=SPITCH_TRANSCRIBE_TIMEOUT,
+        )
+        return transcription.text
+
+    async def _generate_speech(self, text: str, language: str, voice: str) -> bytes:
+        """
+        Calls Spitch speech.generate and reads the audio body, both within
+        the TTS timeout.
+
+        Returns:
+            bytes: The generated WAV audio.
+        """
+        def generate() -> bytes:
+            response = self.client.speech.generate(
+                text=text, language=language, voice=voice, timeout=SPITCH_TTS_TIMEOUT
+            )
+            return response.read()
+
+        return await call_with_timeout(SPITCH_TTS_TIMEOUT, generate)
 
     async def text_to_text_translator(self, text: str, source: str, target: str) -> str:
         """
         Translates text from the source language to the target language.
 
+        The text's language is identified locally first: text already in the
+        target language is returned as is, and a confidently detected source
+        language overrides `source`.
+
         Args:
             text (str): The text to translate.
             source (str): The source language code.
@@ -36,13 +122,14 @@ class Translator:
         Returns:
             str: The translated text.
         """
-        translation = self.client.text.translate(
-            text=text,
-            source=source,
-            target=target,
-        )
-        print(f"Spitch message: {translation.text}")
-        return translation.text
+        source, already_target = resolve_languages(text, source, target)
+        if already_target:
+            print("Text is already in the target language, skipping translation")
+            return text
+
+        translation = await self._translate(text, source=source, target=target)
+        print(f"Spitch message: {translation}")
+        return translation
 
     async def voice_to_text_translator(
         self, file_path: str, default_language: str, output_language: str
@@ -62,40 +149,48 @@ class Translator:
             raise FileNotFoundError(f"File not found: {file_path}")
 
         with open(file_path, "rb") as audio_file:
-            print(default_language, output_language)
-            voice_translation = self.client.speech.transcribe(
-                language=default_language, content=audio_file.read()
-            )
-            print(f"Transcribed Text: {voice_translation.text}")
+            content = audio_file.read()
 
-            translation = self.client.text.translate(
-                text=voice_translation.text,
-                source=default_language,
-                target=output_language,
-            )
-        print(f"Spitch message: {translation.text}")
-        return translation.text
+        print(default_language, output_language)
+        transcribed_text = await self._transcribe(content, language=default_language)
+        print(f"Transcribed Text: {transcribed_text}")
+
+        translation = await self._translate(
+            transcribed_text, source=default_language, target=output_language
+        )
+        print(f"Spitch message: {translation}")
+        return translation
 
     async def text_to_voice_translator(
-        self, text: str, input_language: str, output_language: str
+        self, text: str, input_language: str, output_language: str, output_file: str = "new.wav"
     ) -> bool:
         """
         Translates text and generates speech in the output language.
+        Translation is skipped when the text is already in the output language.
 
         Args:
             text (str): The text to translate and synthesize.
             input_language (str): Source language code.
             output_language (str): Target language code.
+            output_file (str): Path for the generated WAV file. An MP3 copy is
+                written next to it.
 
         Returns:
             bool: True if successful, False otherwise.
+
+        Raises:
+            SpitchUnavailableError: If Spitch is rejecting or timing out calls.
         """
         try:
-            text_translation = self.client.text.translate(
-                text=text,
-                source=input_language,
-                target=output_language,
+            input_language, already_target = resolve_languages(
+                text, input_language, output_language
             )
+            if already_target:
+                text_translation = text
+            else:
+                text_translation = await self._translate(
+                    text, source=input_language, target=output_language
+                )
 
             # Select voice based on output language
             voice_map = {
@@ -107,27 +202,30 @@ class Translator:
             voice = voice_map.get(output_language, "lucy")
 
             # Generate speech and save as WAV
-            with open("new.wav", "wb") as audio_file:
-                response = self.client.speech.generate(
-                    text=text_translation.text, language=output_language, voice=voice
-                )
-                audio_file.write(response.read())
-                print("Audio file saved as 'new.wav'")
+            audio_bytes = await self._generate_speech(
+                text_translation, language=output_language, voice=voice
+            )
+            with open(output_file, "wb") as audio_file:
+                audio_file.write(audio_bytes)
+                print(f"Audio file saved as '{output_file}'")
 
             # Convert WAV to MP3
-            if self.convert_audio_to_mp3("new.wav", "new.mp3"):
-                print("Audio file converted to 'new.mp3'")
+            mp3_file = output_file.rsplit(".", 1)[0] + ".mp3"
+            if await run_blocking(self.convert_audio_to_mp3, output_file, mp3_file):
+                print(f"Audio file converted to '{mp3_file}'")
                 return True
             else:
                 print("Audio conversion failed.")
                 return False
 
+        except SpitchUnavailableError:
+            raise
         except Exception as e:
             print(f"Error: {e}")
             return False
 
     async def voice_to_voice_translator(
-        self, file_path: str, default_language: str, output_language: str
+        self, file_path: str, default_language: str, output_language: str, output_file: str = "new.wav"
     ) -> bool:
         """
         Transcribes speech from an audio file, translates it, and generates
@@ -137,9 +235,13 @@ class Translator:
             file_path (str): Path to the audio file.
             default_language (str): Source language code.
             output_language (str): Target language code.
+            output_file (str): Path for the generated WAV file.
 
         Returns:
             bool: True if successful, False otherwise.
+
+        Raises:
+            SpitchUnavailableError: If Spitch is rejecting or timing out calls.
         """
         if not os.path.isfile(file_path):
             print(f"File not found: {file_path}")
@@ -147,14 +249,11 @@ class Translator:
 
         try:
             with open(file_path, "rb") as audio_file:
-                text_translation = self.client.speech.transcribe(
-                    language=default_language, content=audio_file.read()
-                )
+                content = audio_file.read()
+            transcribed_text = await self._transcribe(content, language=default_language)
 
-            translated_text = self.client.text.translate(
-                text=text_translation.text,
-                source=default_language,
-                target=output_language,
+            translated_text = await self._translate(
+                transcribed_text, source=default_language, target=output_language
             )
 
             # Select voice based on output language
@@ -166,17 +265,17 @@ class Translator:
             }
             voice = voice_map.get(output_language, "sade")
 
-            with open("new.wav", "wb") as audio_file:
-                response = self.client.speech.generate(
-                    text=translated_text.text,
-                    language=output_language,
-                    voice=voice,
-                )
-                audio_file.write(response.read())
-                print("Audio file saved as 'new.wav'")
+            audio_bytes = await self._generate_speech(
+                translated_text, language=output_language, voice=voice
+            )
+            with open(output_file, "wb") as audio_file:
+                audio_file.write(audio_bytes)
+                print(f"Audio file saved as '{output_file}'")
 
             return True
 
+        except SpitchUnavailableError:
+            raise
         except Exception as e:
             print(f"Error: {e}")
             return False
@@ -0,0 +1,157 @@
+"""
+profiling.py
+
+This module provides on-demand diagnostics for a live worker: a low-overhead
+sampling profiler that emits flamegraph-compatible collapsed stacks, a dump
+of pending asyncio tasks showing what each one is awaiting, and tracemalloc
+snapshot diffs for tracking memory growth.
+"""
+
+import os
+import sys
+import time
+import asyncio
+import threading
+import tracemalloc
+from collections import Counter
+
+
+def _frame_name(code) -> str:
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+def sample_stacks(seconds: float, interval: float = 0.005) -> str:
+    """
+    Samples the stacks of all threads for `seconds` and returns them in
+    collapsed-stack format ("thread;outer;...;inner count" per line), which
+    flamegraph.pl and speedscope read directly.
+
+    Args:
+        seconds (float): How long to sample for.
+        interval (float): Seconds between samples.
+
+    Returns:
+        str: Collapsed stacks, most frequent first.
+    """
+    own_id = threading.get_ident()
+    stacks = Counter()
+    deadline = time.monotonic() + seconds
+
+    while time.monotonic() < deadline:
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_name(frame.f_code))
+                frame = frame.f_back
+            stack.append(names.get(thread_id, str(thread_id)).replace(" ", "_"))
+            stacks[";".join(reversed(stack))] += 1
+        time.sleep(interval)
+
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+def _await_chain(coro) -> list:
+    """
+    Follows a coroutine's `cr_await` links down to the innermost awaitable.
+    """
+    chain = []
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None)
+        code = getattr(coro, "cr_code", None) or getattr(coro, "gi_code", None)
+        if code is not None:
+            line = frame.f_lineno if frame is not None else code.co_firstlineno
+            chain.append(f"{os.path.basename(code.co_filename)}:{line} {code.co_name}")
+            coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None)
+        else:
+            # A Future or other awaitable at the bottom of the chain
+            chain.append(repr(coro)[:200])
+            break
+    return chain
+
+
+def dump_tasks(contains: str = None) -> list:
+    """
+    Lists pending asyncio tasks and the chain of awaits each is blocked on.
+    Must be called from the event loop thread.
+
+    Args:
+        contains (str): Only include tasks whose await chain mentions this
+            name, e.g. "webhook_post".
+
+    Returns:
+        list: One dict per task with its name and await chain.
+    """
+    current = asyncio.current_task()
+    tasks = []
+    for task in asyncio.all_tasks():
+        if task is current:
+            continue
+        chain = _await_chain(task.get_coro())
+        if contains and not any(contains in step for step in chain):
+            continue
+        tasks.append({"task": task.get_name(), "awaiting": chain})
+    return tasks
+
+
+class TracemallocTracker:
+    """
+    Starts tracemalloc on demand and reports allocation growth between
+    successive snapshots.
+    """
+
+    def __init__(self):
+        self._baseline = None
+
+    def start(self, frames: int = 10) -> None:
+        """
+        Starts tracing and takes the baseline snapshot.
+
+        Args:
+            frames (int): Traceback depth stored per allocation.
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        self._baseline = tracemalloc.take_snapshot()
+
+    def diff(self, top: int = 20) -> dict:
+        """
+        Compares a new snapshot against the previous one, which it then
+        replaces, and returns the largest growth by source line.
+
+        Args:
+            top (int): Number of entries to return.
+
+        Returns:
+            dict: Traced memory totals and the top allocation differences.
+        """
+        if not tracemalloc.is_tracing() or self._baseline is None:
+            raise RuntimeError("tracemalloc is not running")
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, tracemalloc.__file__)]
+        )
+        stats = snapshot.compare_to(self._baseline, "lineno")
+        self._baseline = snapshot
+        current, peak = tracemalloc.get_traced_memory()
+        return {
+            "traced_bytes": current,
+            "peak_bytes": peak,
+            "top": [
+                {
+                    "location": str(stat.traceback),
+                    "size_diff": stat.size_diff,
+                    "size": stat.size,
+                    "count_diff": stat.count_diff,
+                }
+                for stat in stats[:top]
+            ],
+        }
+
+    def stop(self) -> None:
+        """
+        Stops tracing and drops the baseline.
+        """
+        tracemalloc.stop()
+        self._baseline = None
@@ -0,0 +1,292 @@
+"""
+resilience.py
+
+This module wraps blocking Spitch client calls with per-operation timeouts,
+a circuit breaker and optional hedged requests. Calls run in a worker thread
+of the current execution lane so a slow Spitch response never blocks the
+event loop, and once Spitch keeps failing the breaker opens and callers fail
+fast instead of piling up.
+"""
+
+import os
+import time
+import asyncio
+import threading
+from dotenv import load_dotenv
+from spitch import APIConnectionError, APIStatusError, APITimeoutError
+
+from lanes import run_blocking
+from metrics import LatencyTracker
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Per-operation timeouts (seconds)
+SPITCH_TRANSLATE_TIMEOUT = float(os.getenv("SPITCH_TRANSLATE_TIMEOUT", 10))
+SPITCH_TRANSCRIBE_TIMEOUT = float(os.getenv("SPITCH_TRANSCRIBE_TIMEOUT", 60))
+SPITCH_TTS_TIMEOUT = float(os.getenv("SPITCH_TTS_TIMEOUT", 60))
+
+# Circuit breaker configuration
+SPITCH_BREAKER_FAILURES = int(os.getenv("SPITCH_BREAKER_FAILURES", 5))
+SPITCH_BREAKER_RESET = float(os.getenv("SPITCH_BREAKER_RESET", 30))
+
+# Hedged requests for text.translate
+SPITCH_HEDGE_TRANSLATE = os.getenv("SPITCH_HEDGE_TRANSLATE", "False") == "True"
+SPITCH_HEDGE_MIN_SAMPLES = int(os.getenv("SPITCH_HEDGE_MIN_SAMPLES", 20))
+
+
+class SpitchUnavailableError(Exception):
+    """
+    Raised when a Spitch call cannot be served in time.
+    """
+
+
+class CircuitOpenError(SpitchUnavailableError):
+    """
+    Raised when the circuit breaker is open and the call was not attempted.
+    """
+
+
+class SpitchTimeoutError(SpitchUnavailableError):
+    """
+    Raised when a Spitch call exceeds its operation timeout.
+    """
+
+
+class CircuitBreaker:
+    """
+    A consecutive-failure circuit breaker.
+
+    The breaker is closed while calls succeed. After `failure_threshold`
+    consecutive failures it opens and rejects calls for `reset_timeout`
+    seconds, then lets a single trial call through (half-open). A successful
+    trial closes the breaker again; a failed one re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        """
+        Initializes the breaker in the closed state.
+
+        Args:
+            failure_threshold (int): Consecutive failures before opening.
+            reset_timeout (float): Seconds to stay open before a trial call.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.rejected = 0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """
+        Checks whether a call may be attempted right now.
+
+        Returns:
+            bool: True if the call may proceed, False if it should fail fast.
+        """
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    self.rejected += 1
+                    return False
+                self.state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self.state == self.HALF_OPEN:
+                if self._trial_in_flight:
+                    self.rejected += 1
+                    return False
+                self._trial_in_flight = True
+            return True
+
+    def record_success(self) -> None:
+        """
+        Records a successful call and closes the breaker.
+        """
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def release(self) -> None:
+        """
+        Frees the half-open trial slot without recording an outcome, for calls
+        that were cancelled or failed for reasons unrelated to Spitch health.
+        """
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        """
+        Records a failed call, opening the breaker if the threshold is reached.
+        """
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    print(f"Circuit breaker opened after {self.failures} failures")
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def stats(self) -> dict:
+        """
+        Returns the breaker state for metrics reporting.
+        """
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "rejected": self.rejected,
+        }
+
+
+# Shared breaker for all Spitch operations, and translate latency window
+spitch_breaker = CircuitBreaker(SPITCH_BREAKER_FAILURES, SPITCH_BREAKER_RESET)
+translate_latency = LatencyTracker()
+hedge_stats = {"hedged": 0, "hedge_wins": 0}
+
+
+def is_outage(error: BaseException) -> bool:
+    """
+    Checks whether an error means Spitch itself is unhealthy: a timeout, a
+    connection failure or a 5xx response. Client errors such as a bad request
+    or an auth failure do not count towards opening the breaker.
+    """
+    if isinstance(error, (asyncio.TimeoutError, SpitchTimeoutError, APIConnectionError)):
+        return True
+    return isinstance(error, APIStatusError) and error.status_code >= 500
+
+
+def as_unavailable(error: BaseException, timeout: float) -> SpitchUnavailableError:
+    """
+    Wraps an outage error from the SDK so callers only have to handle
+    SpitchUnavailableError to send the "service busy" reply.
+    """
+    if isinstance(error, SpitchUnavailableError):
+        return error
+    if isinstance(error, (asyncio.TimeoutError, APITimeoutError)):
+        return SpitchTimeoutError(f"Spitch call timed out after {timeout}s")
+    return SpitchUnavailableError(f"Spitch is unavailable: {error}")
+
+
+async def call_with_timeout(
+    timeout: float, func, /, *args, breaker: CircuitBreaker = None, tracker: LatencyTracker = None, **kwargs
+):
+    """
+    Calls a blocking function in a worker thread, guarded by a timeout and
+    the circuit breaker.
+
+    Args:
+        timeout (float): Seconds to wait before giving up.
+        func: The blocking callable.
+        breaker (CircuitBreaker): Breaker to consult, defaults to the Spitch breaker.
+        tracker (LatencyTracker): Optional latency window to record into.
+
+    Returns:
+        The callable's result.
+
+    Raises:
+        CircuitOpenError: If the breaker is open.
+        SpitchTimeoutError: If the call does not finish within `timeout`.
+        SpitchUnavailableError: If Spitch fails with a connection error or 5xx.
+    """
+    breaker = breaker or spitch_breaker
+    if not breaker.allow():
+        raise CircuitOpenError("Spitch circuit is open")
+
+    start = time.monotonic()
+    try:
+        result = await asyncio.wait_for(run_blocking(func, *args, **kwargs), timeout)
+    except asyncio.TimeoutError:
+        breaker.record_failure()
+        raise SpitchTimeoutError(f"Spitch call timed out after {timeout}s")
+    except BaseException as e:
+        if not is_outage(e):
+            breaker.release()
+            raise
+        breaker.record_failure()
+        raise as_unavailable(e, timeout) from e
+    if tracker is not None:
+        tracker.record(time.monotonic() - start)
+    breaker.record_success()
+    return result
+
+
+async def hedged_call(
+    timeout: float, tracker: LatencyTracker, func, /, *args, breaker: CircuitBreaker = None, **kwargs
+):
+    """
+    Calls a blocking function and, if it has not answered by the observed
+    p95 latency, fires one duplicate and returns whichever finishes first.
+
+    Hedging only starts once `tracker` holds enough samples to estimate p95,
+    so roughly one call in twenty is duplicated.
+
+    Args:
+        timeout (float): Overall seconds to wait for either attempt.
+        tracker (LatencyTracker): Latency window used for the hedge delay.
+        func: The blocking callable.
+        breaker (CircuitBreaker): Breaker to consult, defaults to the Spitch breaker.
+
+    Returns:
+        The result of the first successful attempt.
+
+    Raises:
+        CircuitOpenError: If the breaker is open.
+        SpitchUnavailableError: If neither attempt succeeds because of a
+            timeout, connection error or 5xx.
+    """
+    breaker = breaker or spitch_breaker
+    if not breaker.allow():
+        raise CircuitOpenError("Spitch circuit is open")
+
+    start = time.monotonic()
+    hedge_delay = tracker.percentile(95, min_samples=SPITCH_HEDGE_MIN_SAMPLES)
+    primary = asyncio.ensure_future(run_blocking(func, *args, **kwargs))
+    tasks = [primary]
+    error = None
+
+    try:
+        if hedge_delay is not None and hedge_delay < timeout:
+            done, _ = await asyncio.wait(tasks, timeout=hedge_delay)
+            if not done:
+                tasks.append(asyncio.ensure_future(run_blocking(func, *args, **kwargs)))
+                hedge_stats["hedged"] += 1
+
+        pending = set(tasks)
+        while pending:
+            remaining = timeout - (time.monotonic() - start)
+            if remaining <= 0:
+                break
+            done, pending = await asyncio.wait(
+                pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                if task.exception() is None:
+                    if task is not primary:
+                        hedge_stats["hedge_wins"] += 1
+                    tracker.record(time.monotonic() - start)
+                    breaker.record_success()
+                    return task.result()
+                error = task.exception()
+    except BaseException:
+        breaker.release()
+        raise
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    if error is None:
+        breaker.record_failure()
+        raise SpitchTimeoutError(f"Spitch call timed out after {timeout}s")
+    if not is_outage(error):
+        breaker.release()
+        raise error
+    breaker.record_failure()
+    raise as_unavailable(error, timeout) from error
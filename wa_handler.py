@@ -4,6 +4,8 @@ import requests
 from dotenv import load_dotenv
 from pydub import AudioSegment
 
+from lanes import run_blocking
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -11,8 +13,9 @@ load_dotenv()
 PHONE_NUMBER_ID = os.environ.get("WA_PHONE_NUMBER_ID")
 ACCESS_TOKEN = os.getenv("WA_ACCESS_TOKEN")
 API_VERSION = "v18.0"
+GRAPH_URL = os.getenv("WA_GRAPH_URL", "https://graph.facebook.com")
 
-MESSAGING_URL = f"https://graph.facebook.com/{API_VERSION}/{PHONE_NUMBER_ID}/messages"
+MESSAGING_URL = f"{GRAPH_URL}/{API_VERSION}/{PHONE_NUMBER_ID}/messages"
 MESSAGING_HEADERS = {
     "Content-Type": "application/json",
     "Authorization": f"Bearer {ACCESS_TOKEN}",
@@ -35,7 +38,9 @@ async def send_message(message: str, phone_number: str) -> None:
     })
 
     try:
-        response = requests.post(MESSAGING_URL, headers=MESSAGING_HEADERS, data=payload)
+        response = await run_blocking(
+            requests.post, MESSAGING_URL, headers=MESSAGING_HEADERS, data=payload
+        )
         response.raise_for_status()
         print("MESSAGE SENT")
     except requests.exceptions.RequestException as e:
@@ -43,32 +48,48 @@ async def send_message(message: str, phone_number: str) -> None:
         raise
 
 
-async def get_whatsapp_media(audio_media_id: str) -> bytes:
+async def get_whatsapp_media_url(audio_media_id: str) -> str:
     """
-    Downloads a media file from WhatsApp using its media ID.
+    Looks up the download URL of a WhatsApp media file.
 
     Args:
         audio_media_id (str): The media ID of the audio file.
 
     Returns:
-        bytes: The content of the downloaded media file.
+        str: The URL the media bytes can be downloaded from.
     """
-    # Step 1: Get the media URL using the media ID
     media_info_url = (
-        f"https://graph.facebook.com/{API_VERSION}/{audio_media_id}"
+        f"{GRAPH_URL}/{API_VERSION}/{audio_media_id}"
         f"?phone_number_id={PHONE_NUMBER_ID}"
     )
     headers = {"Authorization": f"Bearer {ACCESS_TOKEN}"}
 
     try:
-        response = requests.get(media_info_url, headers=headers)
+        response = await run_blocking(requests.get, media_info_url, headers=headers)
         response.raise_for_status()
         media_url = response.json().get("url")
         if not media_url:
             raise Exception("Media URL not found in response.")
+        return media_url
+    except requests.exceptions.RequestException as e:
+        print(f"Failed to look up media: {e}")
+        raise
 
-        # Step 2: Download the audio file from the media URL
-        media_response = requests.get(media_url, headers=headers)
+
+async def download_whatsapp_media(media_url: str) -> bytes:
+    """
+    Downloads media bytes from a URL returned by `get_whatsapp_media_url`.
+
+    Args:
+        media_url (str): The media download URL.
+
+    Returns:
+        bytes: The content of the downloaded media file.
+    """
+    headers = {"Authorization": f"Bearer {ACCESS_TOKEN}"}
+
+    try:
+        media_response = await run_blocking(requests.get, media_url, headers=headers)
         media_response.raise_for_status()
         return media_response.content
     except requests.exceptions.RequestException as e:
@@ -86,7 +107,7 @@ async def upload_audio_file(file_path: str) -> str:
     Returns:
         str: The media ID of the uploaded file.
     """
-    url = f"https://graph.facebook.com/{API_VERSION}/{PHONE_NUMBER_ID}/media"
+    url = f"{GRAPH_URL}/{API_VERSION}/{PHONE_NUMBER_ID}/media"
     headers = {
         "Authorization": f"Bearer {ACCESS_TOKEN}",
     }
@@ -98,9 +119,9 @@ async def upload_audio_file(file_path: str) -> str:
     # Convert WAV to MP3 if necessary
     if file_path.lower().endswith(".wav"):
         try:
-            audio = AudioSegment.from_wav(file_path)
+            audio = await run_blocking(AudioSegment.from_wav, file_path)
             mp3_file_path = file_path.rsplit(".", 1)[0] + ".mp3"
-            audio.export(mp3_file_path, format="mp3")
+            await run_blocking(audio.export, mp3_file_path, format="mp3")
             file_path = mp3_file_path
         except Exception as e:
             print(f"Failed to convert WAV to MP3: {e}")
@@ -113,7 +134,7 @@ async def upload_audio_file(file_path: str) -> str:
                 'messaging_product': (None, 'whatsapp'),
                 'file': (os.path.basename(file_path), audio_file, 'audio/mpeg')
             }
-            response = requests.post(url, headers=headers, files=files)
+            response = await run_blocking(requests.post, url, headers=headers, files=files)
             if response.status_code != 200:
                 print(f"Error Response: {response.text}")
                 response.raise_for_status()
@@ -152,7 +173,9 @@ async def send_voice_message(file_path: str, phone_number: str) -> None:
         })
 
         # Send the audio message
-        response = requests.post(MESSAGING_URL, headers=MESSAGING_HEADERS, data=payload)
+        response = await run_blocking(
+            requests.post, MESSAGING_URL, headers=MESSAGING_HEADERS, data=payload
+        )
         response.raise_for_status()
 
         # Check the response for message ID